@@ -4,14 +4,24 @@ dot-for-dbt package metadata.
 Exports a __version__ attribute sourced from installed package metadata,
 falling back to a placeholder when running from a local (editable) checkout
 prior to an actual build/install.
+
+The version is resolved lazily on first access: importing importlib.metadata
+is one of the most expensive parts of start-up and most imports of the
+package never need it.
 """
 
-from importlib.metadata import version as _pkg_version, PackageNotFoundError
+__all__ = ["__version__"]
+
 
-try:
-    __version__ = _pkg_version("dot-for-dbt")
-except PackageNotFoundError:
-    # Fallback for local, not-yet-built editable environments.
-    __version__ = "0.0.0"
+def __getattr__(name: str):
+    if name == "__version__":
+        from importlib.metadata import version as _pkg_version, PackageNotFoundError
 
-__all__ = ["__version__"]
+        try:
+            value = _pkg_version("dot-for-dbt")
+        except PackageNotFoundError:
+            # Fallback for local, not-yet-built editable environments.
+            value = "0.0.0"
+        globals()["__version__"] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
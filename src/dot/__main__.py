@@ -1,3 +1,3 @@
 if __name__ == "__main__":
-    from dot.cli import app
-    app()
+    from dot.cli import main
+    main()
@@ -1,22 +1,45 @@
 #!/usr/bin/env python3
 
+from __future__ import annotations
+
+import os
 import sys
-import argparse
+import functools
 import subprocess
 
 from pathlib import Path
-from typing import Optional
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Optional
 
-from dot import dot, __version__
-from .git import get_repo_path, get_short_commit_hash
+from . import dot
+from .git import get_repo_path, get_short_commit_hash, get_commit_hashes
 from .config import load_config, resolve_environment, ConfigError
 from .cli_prompts import run_registered_prompts, PromptAbortError
 
 from . import logging
 from .logging import get_logger
 
+if TYPE_CHECKING:
+    import argparse
+
 logger = get_logger('dot.cli')
 
+ALLOWED_DBT_COMMANDS = frozenset({
+    "build", "clean", "clone", "compile", "debug", "deps", "docs", "init",
+    "list", "parse", "retry", "run", "run-operation", "seed", "show",
+    "snapshot", "source", "test"
+})
+_ALLOWED_DBT_COMMANDS_HELP = ", ".join(sorted(ALLOWED_DBT_COMMANDS))
+
+# Boolean CLI flags understood by the argparse-free fast path (flag -> dest)
+_BOOLEAN_FLAGS = {
+    "-v": "verbose",
+    "--verbose": "verbose",
+    "--dry-run": "dry_run",
+    "--disable-prompts": "disable_prompts",
+    "--no-deps": "no_deps",
+}
+
 def parse_env_gitref(spec: str) -> tuple[Optional[str], Optional[str]]:
     """
     Parse a token of the form 'env@ref', '@ref', 'env', or 'env@'.
@@ -25,34 +48,78 @@ def parse_env_gitref(spec: str) -> tuple[Optional[str], Optional[str]]:
     """
     if spec is None:
         return (None, None)
-    if spec.count('@') > 1:
+    env_part, sep, ref_part = spec.partition('@')
+    if sep and '@' in ref_part:
         raise ValueError(f"Invalid spec '{spec}': multiple '@' separators.")
-    if '@' in spec:
-        env_part, ref_part = spec.split('@', 1)
-    else:
-        env_part, ref_part = spec, None
-    env_part = env_part.strip() if env_part and env_part.strip() != '' else None
-    ref_part = ref_part.strip() if ref_part and ref_part.strip() != '' else None
-    return env_part, ref_part
-
-def parse_args() -> tuple[argparse.Namespace, list[str]]:
-    """
-    Parse command-line arguments and separate passthrough args.
+    return env_part.strip() or None, ref_part.strip() or None
 
-    Returns:
-        Tuple[argparse.Namespace, List[str]]: A tuple containing the parsed arguments
-        as an argparse.Namespace and a list of passthrough arguments after '--'.
+def _split_passthrough(argv: list[str]) -> tuple[list[str], list[str]]:
     """
+    Split argv on the first '--' into (dot args, dbt passthrough args).
+    """
+    try:
+        idx = argv.index('--')
+    except ValueError:
+        return argv, []
+    return argv[:idx], argv[idx+1:]
 
-    argv = sys.argv[1:]
+def _fast_parse_args(cli_args: list[str]) -> Optional[SimpleNamespace]:
+    """
+    Parse the common, unambiguous argument shapes with a single scan of argv,
+    avoiding the import and construction cost of argparse.
 
-    if '--' in argv:
-        idx = argv.index('--')
-        cli_args = argv[:idx]
-        passthrough_args = argv[idx+1:]
-    else:
-        cli_args = argv
-        passthrough_args = []
+    Returns None for anything else (help, unknown or abbreviated options,
+    invalid commands, positionals split around options...) so that argparse
+    handles it and produces its usual output and error messages.
+    """
+    args = SimpleNamespace(
+        verbose=False,
+        dry_run=False,
+        disable_prompts=False,
+        no_deps=False,
+        defer=None,
+        dbt_command=None,
+        environment=None,
+    )
+    positionals: list[str] = []
+    seen_option_after_positional = False
+
+    i = 0
+    while i < len(cli_args):
+        token = cli_args[i]
+        if token in _BOOLEAN_FLAGS:
+            setattr(args, _BOOLEAN_FLAGS[token], True)
+            seen_option_after_positional = bool(positionals)
+        elif token == "--defer":
+            i += 1
+            if i == len(cli_args) or cli_args[i].startswith("-"):
+                return None
+            args.defer = cli_args[i]
+            seen_option_after_positional = bool(positionals)
+        elif token.startswith("-"):
+            return None
+        else:
+            # argparse only consumes positionals as one contiguous group
+            if seen_option_after_positional:
+                return None
+            positionals.append(token)
+        i += 1
+
+    if not 1 <= len(positionals) <= 2 or positionals[0] not in ALLOWED_DBT_COMMANDS:
+        return None
+
+    args.dbt_command = positionals[0]
+    if len(positionals) == 2:
+        args.environment = positionals[1]
+    return args
+
+@functools.cache
+def _build_parser() -> argparse.ArgumentParser:
+    """
+    Build the full argparse parser once per process; it is reused for every
+    parse that falls off the fast path.
+    """
+    import argparse
 
     parser = argparse.ArgumentParser(
         description="Run dbt commands with environment-based configuration from dot_environments.yml"
@@ -87,29 +154,53 @@ def parse_args() -> tuple[argparse.Namespace, list[str]]:
         metavar="env@gitref or @gitref",
         help="Defer to artifacts from a prior isolated build (git ref required)."
     )
-    allowed_dbt_commands = [
-        "build", "clean", "clone", "compile", "debug", "deps", "docs", "init",
-        "list", "parse", "retry", "run", "run-operation", "seed", "show",
-        "snapshot", "source", "test"
-    ]
+    # Validated in parse_args with a set lookup rather than argparse `choices`
     parser.add_argument(
         "dbt_command",
-        choices=allowed_dbt_commands,
-        help=f"dbt command to run. Allowed: {', '.join(allowed_dbt_commands)}"
+        help=f"dbt command to run. Allowed: {_ALLOWED_DBT_COMMANDS_HELP}"
     )
     parser.add_argument(
         "environment",
         nargs="?",
         help="Environment name as defined in dot_environments.yml (optional, uses default if omitted, may append @<gitref>)"
     )
-    args = parser.parse_args(cli_args)
+    return parser
+
+def parse_args() -> tuple[SimpleNamespace | argparse.Namespace, list[str]]:
+    """
+    Parse command-line arguments and separate passthrough args.
+
+    The common argument shapes are handled by a lightweight scan; argparse is
+    only imported and built for help output, errors and unusual forms.
+
+    Returns:
+        Tuple[Namespace, List[str]]: A tuple containing the parsed arguments
+        and a list of passthrough arguments after '--'.
+    """
+
+    cli_args, passthrough_args = _split_passthrough(sys.argv[1:])
+
+    args = _fast_parse_args(cli_args)
+    if args is None:
+        parser = _build_parser()
+        args = parser.parse_args(cli_args)
+        if args.dbt_command not in ALLOWED_DBT_COMMANDS:
+            parser.error(
+                f"argument dbt_command: invalid choice: '{args.dbt_command}' "
+                f"(choose from {_ALLOWED_DBT_COMMANDS_HELP})"
+            )
     return args, passthrough_args
 
 
-def app() -> int:
+def app(exec_dbt: bool = False) -> int:
     """
     Main entry point for the CLI application.
 
+    Args:
+        exec_dbt (bool): If True (and on a POSIX platform), replace the
+            current process with dbt instead of spawning it as a child, since
+            nothing remains to be done once dbt starts.
+
     Returns:
         int: The exit code from the dbt command or error handling.
 
@@ -128,6 +219,8 @@ def app() -> int:
     if args.verbose:
         logging.set_level(logging.DEBUG)
 
+    # Resolved here rather than at import so --help and usage errors skip it
+    from dot import __version__
     logger.info(f"✨ [bold purple]dot-for-dbt ([cyan]v{__version__}[/])[/] ✨")
 
     if not (dbt_project_path / "dbt_project.yml").exists():
@@ -151,6 +244,8 @@ def app() -> int:
 
         # Pre-load config (needed for defer resolution & default environment)
         cfg = load_config(dbt_project_path)
+        # Environment resolutions shared by every command built from cfg
+        resolved_environments: dict = {}
 
         # Defer state resolution (commit-based only)
         defer_path: Optional[Path] = None
@@ -174,7 +269,7 @@ def app() -> int:
 
             # Validate environment existence
             try:
-                resolve_environment(cfg, defer_env)
+                resolve_environment(cfg, defer_env, resolved_environments)
             except ConfigError:
                 logger.error(f"Defer environment '{defer_env}' not defined in configuration.")
                 sys.exit(1)
@@ -185,7 +280,7 @@ def app() -> int:
                 logger.error(f"git ref resolution failed: {e}")
                 sys.exit(1)
 
-            candidate = repo_root / ".dot" / "build" / short_hash / "env" / defer_env / "target"
+            candidate = repo_root.joinpath(".dot", "build", short_hash, "env", defer_env, "target")
             manifest = candidate / "manifest.json"
             if not candidate.exists():
                 logger.error(f"Deferred state not found at {candidate}. Run: [bold]dot build {defer_env}@{defer_ref}[/] first.")
@@ -196,6 +291,9 @@ def app() -> int:
 
             defer_path = candidate
 
+        # Resolve the gitref once for every command built in this run
+        commit_hashes = get_commit_hashes(repo_root, gitref) if gitref else None
+
         # If this is an isolated build (gitref provided) automatically install dependencies
         # unless user requested --no-deps or the primary command itself is 'deps' or dry-run.
         if gitref and not args.no_deps and args.dbt_command != "deps" and not args.dry_run:
@@ -207,7 +305,11 @@ def app() -> int:
                     active_environment=active_environment,
                     passthrough_args=[],
                     gitref=gitref,
-                    defer_path=None
+                    defer_path=None,
+                    config=cfg,
+                    commit_hashes=commit_hashes,
+                    repo_path=repo_root,
+                    resolved_environments=resolved_environments,
                 )
                 logger.info(f"[green]{' '.join(deps_cmd)}[/]")
                 subprocess.run(deps_cmd, check=True)
@@ -221,7 +323,11 @@ def app() -> int:
             active_environment=active_environment,
             passthrough_args=passthrough_args,
             gitref=gitref,
-            defer_path=defer_path
+            defer_path=defer_path,
+            config=cfg,
+            commit_hashes=commit_hashes,
+            repo_path=repo_root,
+            resolved_environments=resolved_environments,
         )
     except Exception as e:
         logger.error(f"Error: {e}")
@@ -237,6 +343,11 @@ def app() -> int:
     if args.dry_run:
         return 0
 
+    if exec_dbt and os.name == "posix":
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os.execvp(dbt_command[0], dbt_command)
+
     try:
         result = subprocess.run(
             dbt_command,
@@ -246,8 +357,14 @@ def app() -> int:
     except subprocess.CalledProcessError as e:
         return e.returncode
 
-if __name__ == "__main__":
+def main() -> None:
+    """
+    Console script entry point: run the CLI, handing the process over to dbt.
+    """
     try:
-        sys.exit(app())
+        sys.exit(app(exec_dbt=True))
     except KeyboardInterrupt:
         sys.exit(130)
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import json
 import os
+import re
 import sys
 import tempfile
 from dataclasses import dataclass
@@ -20,6 +21,9 @@ logger = get_logger("dot.cli_prompts")
 CONFIG_REL_PATH = Path(".dot") / "config.yml"
 PROMPTS_ROOT_KEY = "prompts"
 
+# A `.dot` or `.dot/` line, ignoring surrounding whitespace (same as line.strip())
+GITIGNORE_DOT_ENTRY = re.compile(rb"^[ \t\r\f\v]*\.dot/?[ \t\r\f\v]*$", re.MULTILINE)
+
 REPO_REQUIRED_VSCODE_SETTINGS = {
     "search.exclude": {
         "**/.dot": True,
@@ -60,16 +64,21 @@ def register_prompt(task: PromptTask) -> None:
 
 def _load_prompts_config(repo_root: Path) -> Dict[str, Any]:
     cfg_path = repo_root / CONFIG_REL_PATH
-    if not cfg_path.exists():
-        return {}
     try:
+        raw = cfg_path.read_bytes()
         import yaml  # Local import to avoid cost if unused
-        with cfg_path.open("r", encoding="utf-8") as f:
-            data = yaml.safe_load(f) or {}
-            if not isinstance(data, dict):
-                logger.warning(f"[yellow]Ignoring malformed config at {cfg_path} (not a mapping).[/]")
-                return {}
-            return data
+        try:
+            from yaml import CSafeLoader as Loader
+        except ImportError:
+            from yaml import SafeLoader as Loader
+        # Bytes go straight to LibYAML, skipping a Python-side UTF-8 decode
+        data = yaml.load(raw, Loader=Loader) or {}
+        if not isinstance(data, dict):
+            logger.warning(f"[yellow]Ignoring malformed config at {cfg_path} (not a mapping).[/]")
+            return {}
+        return data
+    except FileNotFoundError:
+        return {}
     except Exception as e:
         logger.warning(f"[yellow]Failed to read {cfg_path}: {e}. Treating as empty.[/]")
         return {}
@@ -79,7 +88,11 @@ def _save_prompts_config_atomic(repo_root: Path, data: Dict[str, Any]) -> None:
     cfg_dir = cfg_path.parent
     cfg_dir.mkdir(parents=True, exist_ok=True)
     import yaml
-    serialized = yaml.safe_dump(data, sort_keys=True)
+    try:
+        from yaml import CSafeDumper as Dumper
+    except ImportError:
+        from yaml import SafeDumper as Dumper
+    serialized = yaml.dump(data, Dumper=Dumper, sort_keys=True)
     try:
         with tempfile.NamedTemporaryFile("w", delete=False, encoding="utf-8", dir=str(cfg_dir)) as tmp:
             tmp.write(serialized)
@@ -159,11 +172,9 @@ def _gitignore_detector(repo_root: Path, config: Dict[str, Any], global_disabled
         # Treated as needs action (will abort or disable)
         return DetectorResult.NEEDS_ACTION
     try:
-        with gitignore_path.open("r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if line in (".dot", ".dot/"):
-                    return DetectorResult.COMPLIANT
+        # One regex scan over the raw bytes; no per-line decoding or strings
+        if GITIGNORE_DOT_ENTRY.search(gitignore_path.read_bytes()):
+            return DetectorResult.COMPLIANT
     except Exception:
         return DetectorResult.NEEDS_ACTION
     return DetectorResult.NEEDS_ACTION
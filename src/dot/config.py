@@ -1,9 +1,11 @@
 from __future__ import annotations
 
-import yaml
+import os
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Union
+from . import logging
 from .logging import get_logger
 
 logger = get_logger("dot.config")
@@ -141,6 +143,12 @@ DBT_COMMAND_ARGS = {
     ],
 }
 
+# DBT_COMMAND_ARGS as environment keys (leading dashes stripped), built once
+DBT_COMMAND_ARG_NAMES: Dict[str, frozenset[str]] = {
+    command: frozenset(a.lstrip("-") for a in args)
+    for command, args in DBT_COMMAND_ARGS.items()
+}
+
 # ---------------------------------------------------------------------------
 # Constants
 # ---------------------------------------------------------------------------
@@ -149,9 +157,23 @@ PROJECT_CONFIG_FILENAME = "dot_environments.yml"
 USER_CONFIG_FILENAME = "dot_environments.user.yml"
 PROJECT_VARIABLES_FILENAME = "dot_vars.yml"
 
+_CONFIG_FILENAMES = frozenset({PROJECT_CONFIG_FILENAME, USER_CONFIG_FILENAME, PROJECT_VARIABLES_FILENAME})
+
 # This set avoids redundant logging of config load attempts
 _logged_config_roots: set[str] = set()
 
+# Parsed YAML documents keyed by (path, mtime_ns, size). A single CLI run loads
+# the same files several times (cli, dbt_command, isolated deps), so repeat
+# loads skip the read + parse entirely while still noticing on-disk edits.
+_YAML_CACHE: "OrderedDict[tuple[str, int, int], dict]" = OrderedDict()
+_YAML_CACHE_MAX_ENTRIES = 100
+
+# Loaded configurations keyed by project root plus (name, mtime_ns, size) of
+# each config file present, so an unchanged project skips merging and
+# validation as well as parsing. Entries are never handed out directly.
+_CONFIG_CACHE: "OrderedDict[tuple, DotConfig]" = OrderedDict()
+_CONFIG_CACHE_MAX_ENTRIES = 16
+
 # ---------------------------------------------------------------------------
 # Public API
 # ---------------------------------------------------------------------------
@@ -167,27 +189,39 @@ def load_config(project_root: Path) -> DotConfig:
     user_env_file = project_root / USER_CONFIG_FILENAME
     variables_file = project_root / PROJECT_VARIABLES_FILENAME
 
-    root_key = str(project_root.resolve())
-    if root_key not in _logged_config_roots:
-        _logged_config_roots.add(root_key)
-        logger.debug(f"[blue]⚙️  Loading dot configuration for {project_root}[/]")
-        if project_env_file.exists():
-            logger.debug(f"Found {PROJECT_CONFIG_FILENAME} at {project_env_file}")
-        else:
-            logger.debug(f"[yellow]Couldn't find {PROJECT_CONFIG_FILENAME}[/] at {project_env_file}")
-        if user_env_file.exists():
-            logger.debug(f"Found {USER_CONFIG_FILENAME} at {user_env_file}")
-        else:
-            logger.debug(f"[yellow]Couldn't find {USER_CONFIG_FILENAME}[/] at {user_env_file}")
-        if variables_file.exists():
-            logger.debug(f"Found {PROJECT_VARIABLES_FILENAME} at {variables_file}")
-        else:
-            logger.debug(f"[yellow]Couldn't find {PROJECT_VARIABLES_FILENAME}[/] at {variables_file}")
-
-    variables = _read_variables_specs(variables_file)
-
-    project_env_root = _read_yaml_optional(project_env_file)
-    user_env_root = _read_yaml_optional(user_env_file)
+    # A single directory scan answers every "does this file exist?" question
+    # below instead of stat-ing each config file several times.
+    entries = _scan_config_files(project_root)
+
+    # Skip resolving the root and formatting messages unless they will be emitted
+    if logger.isEnabledFor(logging.DEBUG):
+        root_key = str(project_root.resolve())
+        if root_key not in _logged_config_roots:
+            _logged_config_roots.add(root_key)
+            logger.debug(f"[blue]⚙️  Loading dot configuration for {project_root}[/]")
+            if PROJECT_CONFIG_FILENAME in entries:
+                logger.debug(f"Found {PROJECT_CONFIG_FILENAME} at {project_env_file}")
+            else:
+                logger.debug(f"[yellow]Couldn't find {PROJECT_CONFIG_FILENAME}[/] at {project_env_file}")
+            if USER_CONFIG_FILENAME in entries:
+                logger.debug(f"Found {USER_CONFIG_FILENAME} at {user_env_file}")
+            else:
+                logger.debug(f"[yellow]Couldn't find {USER_CONFIG_FILENAME}[/] at {user_env_file}")
+            if PROJECT_VARIABLES_FILENAME in entries:
+                logger.debug(f"Found {PROJECT_VARIABLES_FILENAME} at {variables_file}")
+            else:
+                logger.debug(f"[yellow]Couldn't find {PROJECT_VARIABLES_FILENAME}[/] at {variables_file}")
+
+    cache_key = _config_cache_key(project_root, entries)
+    cached = _CONFIG_CACHE.get(cache_key) if cache_key is not None else None
+    if cached is not None:
+        _CONFIG_CACHE.move_to_end(cache_key)
+        return _copy_config(cached)
+
+    variables = _read_variables_specs(variables_file, entries.get(PROJECT_VARIABLES_FILENAME))
+
+    project_env_root = _read_yaml_optional(project_env_file, entries.get(PROJECT_CONFIG_FILENAME))
+    user_env_root = _read_yaml_optional(user_env_file, entries.get(USER_CONFIG_FILENAME))
 
     # Reject legacy root-level vars usage in environment files (full switch)
     if "vars" in project_env_root:
@@ -207,15 +241,27 @@ def load_config(project_root: Path) -> DotConfig:
 
     _validate_structure(merged_env_section)
 
-    return DotConfig(
+    cfg = DotConfig(
         variables=variables,
         default_environment=default_env,
         project_root=project_root,
         project_environments=base_env_section,
         user_environments=override_env_section,
     )
-
-def resolve_environment(cfg: DotConfig, name: Optional[str]) -> DotEnvironmentSpec:
+    if cache_key is None:
+        return cfg
+
+    _CONFIG_CACHE[cache_key] = cfg
+    if len(_CONFIG_CACHE) > _CONFIG_CACHE_MAX_ENTRIES:
+        _CONFIG_CACHE.popitem(last=False)
+    # Callers receive their own copy so mutations never leak into the cache
+    return _copy_config(cfg)
+
+def resolve_environment(
+    cfg: DotConfig,
+    name: Optional[str],
+    memo: Optional[Dict[str, DotEnvironmentSpec]] = None,
+) -> DotEnvironmentSpec:
     """
     Resolve the effective environment by name (or default). Returns merged args and vars.
 
@@ -224,6 +270,10 @@ def resolve_environment(cfg: DotConfig, name: Optional[str]) -> DotEnvironmentSp
     This allows a user-level 'all' override to trump a project-specific value,
     which is required for flexible local experimentation (see tests).
     Variable validation (required / strict) only applies to declared specs.
+
+    memo is an optional caller-owned dict of resolutions for this cfg, letting
+    a single run (e.g. isolated deps + primary command) resolve each
+    environment once. Use a fresh dict per cfg.
     """
     if name is None:
         name = cfg.default_environment
@@ -231,11 +281,37 @@ def resolve_environment(cfg: DotConfig, name: Optional[str]) -> DotEnvironmentSp
     if name is None:
         return DotEnvironmentSpec(name=None, args={}, vars={})
 
-    project_envs = cfg.project_environments or {}
-    user_envs = cfg.user_environments or {}
+    if memo is None:
+        return _resolve_environment_layers(cfg, name)
+
+    spec = memo.get(name)
+    if spec is None:
+        spec = _resolve_environment_layers(cfg, name)
+        memo[name] = spec
+
+    # Callers receive their own copy so mutations never leak into the memo
+    return DotEnvironmentSpec(name=spec.name, args=_copy_yaml_tree(spec.args), vars=_copy_yaml_tree(spec.vars))
+
+def dbt_cli_args(dbt_command_name: str, env_spec: DotEnvironmentSpec) -> Dict[str, Any]:
+    """
+    Return a dictionary of allowed dbt CLI arguments for the given command,
+    including vars (unfiltered).
+    """
+    allowed = DBT_COMMAND_ARG_NAMES.get(dbt_command_name, frozenset())
+    filtered: Dict[str, Any] = {k: v for k, v in env_spec.args.items() if k in allowed}
+
+    filtered["vars"] = env_spec.vars
+    return filtered
 
-    available_envs = set(project_envs.keys()) | set(user_envs.keys())
-    available_envs.discard("all")
+# ---------------------------------------------------------------------------
+# Internal helpers
+# ---------------------------------------------------------------------------
+
+def _resolve_environment_layers(cfg: DotConfig, name: str) -> DotEnvironmentSpec:
+    project_envs = cfg.project_environments if isinstance(cfg.project_environments, dict) else {}
+    user_envs = cfg.user_environments if isinstance(cfg.user_environments, dict) else {}
+
+    available_envs = (project_envs.keys() | user_envs.keys()) - {"all"}
 
     if name not in available_envs:
         raise ConfigError(
@@ -243,79 +319,136 @@ def resolve_environment(cfg: DotConfig, name: Optional[str]) -> DotEnvironmentSp
             f"Defined environments: {', '.join(sorted(available_envs)) or 'none'}"
         )
 
-    project_all = project_envs.get("all", {}) if isinstance(project_envs, dict) else {}
-    project_specific = project_envs.get(name, {}) if isinstance(project_envs, dict) else {}
-    user_all = user_envs.get("all", {}) if isinstance(user_envs, dict) else {}
-    user_specific = user_envs.get(name, {}) if isinstance(user_envs, dict) else {}
-
-    def extract_vars(section: Any) -> Dict[str, Any]:
-        if isinstance(section, dict):
-            v = section.get("vars")
-            return v if isinstance(v, dict) else {}
-        return {}
-
-    project_all_vars = extract_vars(project_all)
-    project_specific_vars = extract_vars(project_specific)
-    user_all_vars = extract_vars(user_all)
-    user_specific_vars = extract_vars(user_specific)
+    # Layers in precedence order; non-mapping sections (e.g. `dev:` with no body) contribute nothing
+    layers = [
+        section
+        for section in (
+            project_envs.get("all"),
+            project_envs.get(name),
+            user_envs.get("all"),
+            user_envs.get(name),
+        )
+        if isinstance(section, dict)
+    ]
 
     merged_vars: Dict[str, Any] = {}
-    # Apply precedence order
-    for layer in (project_all_vars, project_specific_vars, user_all_vars, user_specific_vars):
-        merged_vars.update(layer)
-
-    # Args (non-vars keys) follow identical precedence
-    def apply_args(src: Any, dest: Dict[str, Any]):
-        if not isinstance(src, dict):
-            return
-        for k, v in src.items():
-            if k == "vars":
-                continue
-            dest[k] = v
-
     merged_args: Dict[str, Any] = {}
-    for layer in (project_all, project_specific, user_all, user_specific):
-        apply_args(layer, merged_args)
+    for layer in layers:
+        for k, v in layer.items():
+            if k == "vars":
+                if isinstance(v, dict):
+                    merged_vars |= v
+            else:
+                merged_args[k] = v
 
     _validate_variable_assignments(cfg.variables, name, merged_vars)
 
     return DotEnvironmentSpec(name=name, args=merged_args, vars=merged_vars)
 
-def dbt_cli_args(dbt_command_name: str, env_spec: DotEnvironmentSpec) -> Dict[str, Any]:
+def _scan_config_files(project_root: Path) -> Dict[str, Union[os.DirEntry, Path]]:
     """
-    Return a dictionary of allowed dbt CLI arguments for the given command,
-    including vars (unfiltered).
+    Map each config file present in project_root to its directory entry (or
+    Path, when the directory cannot be listed); both provide .stat().
     """
-    allowed = set(a.lstrip("-") for a in DBT_COMMAND_ARGS.get(dbt_command_name, []))
-    filtered: Dict[str, Any] = {}
-
-    for k, v in env_spec.args.items():
-        if k in allowed:
-            filtered[k] = v
+    try:
+        with os.scandir(project_root) as it:
+            return {e.name: e for e in it if e.name in _CONFIG_FILENAMES}
+    except (FileNotFoundError, NotADirectoryError):
+        return {}
+    except PermissionError:
+        # Listing denied but the files may still be readable by name
+        return {
+            name: project_root / name
+            for name in _CONFIG_FILENAMES
+            if (project_root / name).exists()
+        }
+
+def _config_cache_key(project_root: Path, entries: Dict[str, Union[os.DirEntry, Path]]) -> Optional[tuple]:
+    """
+    Key for _CONFIG_CACHE from the scanned config files, or None if one of
+    them vanished mid-scan (the load then proceeds uncached).
+    """
+    stats = []
+    for name in sorted(entries):
+        try:
+            st = entries[name].stat()
+        except FileNotFoundError:
+            return None
+        stats.append((name, st.st_mtime_ns, st.st_size))
+    return (str(project_root), tuple(stats))
+
+def _copy_config(cfg: DotConfig) -> DotConfig:
+    return DotConfig(
+        variables={
+            name: DotVariableSpec(
+                description=spec.description,
+                values=_copy_yaml_tree(spec.values),
+                strict=spec.strict,
+                required=spec.required,
+            )
+            for name, spec in cfg.variables.items()
+        },
+        default_environment=cfg.default_environment,
+        project_root=cfg.project_root,
+        project_environments=_copy_yaml_tree(cfg.project_environments),
+        user_environments=_copy_yaml_tree(cfg.user_environments),
+    )
 
-    filtered["vars"] = env_spec.vars
-    return filtered
+def _read_yaml_optional(path: Path, entry: Optional[Union[os.DirEntry, Path]]) -> dict:
+    """
+    Read a YAML mapping from `path`. `entry` is the file's entry from
+    _scan_config_files, or None when the file is absent.
+    """
+    if entry is None:
+        return {}
+    try:
+        st = entry.stat()
+    except FileNotFoundError:
+        return {}
 
-# ---------------------------------------------------------------------------
-# Internal helpers
-# ---------------------------------------------------------------------------
+    key = (str(path), st.st_mtime_ns, st.st_size)
+    data = _YAML_CACHE.get(key)
+    if data is not None:
+        _YAML_CACHE.move_to_end(key)
+        # Callers receive their own copy so mutations never leak into the cache
+        return _copy_yaml_tree(data)
 
-def _read_yaml_optional(path: Path) -> dict:
-    if not path.exists():
-        return {}
     try:
-        with path.open("r", encoding="utf-8") as f:
-            data = yaml.safe_load(f) or {}
-            if not isinstance(data, dict):
-                raise ConfigError(f"Top-level YAML in {path} must be a mapping.")
-            return data
+        data = _load_yaml_bytes(path.read_bytes()) or {}
+        if not isinstance(data, dict):
+            raise ConfigError(f"Top-level YAML in {path} must be a mapping.")
     except Exception as e:
         raise ConfigError(f"Failed to read {path}: {e}") from e
 
-def _read_variables_specs(path: Path) -> Dict[str, DotVariableSpec]:
-    if not path.exists():
-        return {}
-    raw = _read_yaml_optional(path)
+    _YAML_CACHE[key] = data
+    if len(_YAML_CACHE) > _YAML_CACHE_MAX_ENTRIES:
+        _YAML_CACHE.popitem(last=False)
+    return _copy_yaml_tree(data)
+
+def _copy_yaml_tree(node: Any) -> Any:
+    """
+    Copy a safe-loaded YAML document. Only mappings and sequences are mutable
+    containers there (scalars, dates and bytes are immutable), so this skips
+    copy.deepcopy's memo and per-object dispatch.
+    """
+    if isinstance(node, dict):
+        return {k: _copy_yaml_tree(v) for k, v in node.items()}
+    if isinstance(node, list):
+        return [_copy_yaml_tree(v) for v in node]
+    return node
+
+def _load_yaml_bytes(data: bytes) -> Any:
+    import yaml  # Local import: only needed when a config file is actually parsed
+    # Prefer the LibYAML-backed loader when PyYAML was built with it.
+    try:
+        from yaml import CSafeLoader as Loader
+    except ImportError:
+        from yaml import SafeLoader as Loader
+
+    return yaml.load(data, Loader=Loader)
+
+def _read_variables_specs(path: Path, entry: Optional[Union[os.DirEntry, Path]]) -> Dict[str, DotVariableSpec]:
+    raw = _read_yaml_optional(path, entry)
     if "vars" not in raw:
         # Empty spec file allowed
         return {}
@@ -341,26 +474,18 @@ def _merge_environment(base_env: dict, override_env: dict) -> dict:
     add or change individual variable values without discarding
     previously defined ones.
     """
-    merged: dict = {}
-    merged.update(base_env)
+    merged: dict = dict(base_env)
 
     def merge_env_mapping(existing: dict, incoming: dict) -> dict:
-        out = {}
-        out.update(existing)
-        out.update(incoming)
+        out = existing | incoming
         if isinstance(existing.get("vars"), dict) and isinstance(incoming.get("vars"), dict):
-            nv = existing["vars"].copy()
-            nv.update(incoming["vars"])
-            out["vars"] = nv
+            out["vars"] = existing["vars"] | incoming["vars"]
         return out
 
     for k, v in override_env.items():
-        if isinstance(v, dict) and k in ("default", "all"):
+        if isinstance(v, dict):
             existing = merged.get(k, {}) or {}
             merged[k] = merge_env_mapping(existing if isinstance(existing, dict) else {}, v)
-        elif isinstance(v, dict) and k not in ("default", "all"):
-            existing_env = merged.get(k, {}) or {}
-            merged[k] = merge_env_mapping(existing_env if isinstance(existing_env, dict) else {}, v)
         else:
             merged[k] = v
     return merged
@@ -1,6 +1,5 @@
-import json
 from pathlib import Path
-from typing import Any, Optional, List
+from typing import Any, Iterable, Iterator, Optional, List
 
 from . import logging
 from .logging import get_logger
@@ -8,17 +7,23 @@ from .profiles import write_isolated_profiles_yml
 from .git import (
     create_worktree,
     get_repo_path,
-    get_full_commit_hash,
-    get_short_commit_hash,
+    get_commit_hashes,
 )
 
 from .config import (
     load_config,
     resolve_environment,
     ConfigError,
-    DBT_COMMAND_ARGS,
+    DotConfig,
+    DBT_COMMAND_ARG_NAMES,
 )
 
+# orjson is an optional speedup (`pip install dot-for-dbt[speedups]`)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = get_logger("dot.dot")
 
 def dbt_command(
@@ -28,6 +33,10 @@ def dbt_command(
     passthrough_args: Optional[list[str]] = None,
     gitref: Optional[str] = None,
     defer_path: Optional[Path] = None,
+    config: Optional[DotConfig] = None,
+    commit_hashes: Optional[tuple[str, str]] = None,
+    repo_path: Optional[Path] = None,
+    resolved_environments: Optional[dict] = None,
 ) -> list[str]:
     """
     Construct a dbt CLI command as a list of arguments using the new configuration
@@ -47,6 +56,16 @@ def dbt_command(
         passthrough_args: Extra args after '--' passed directly to dbt.
         gitref: Optional git ref / commit hash for isolated build.
         defer_path: Optional path to a prior isolated build target directory used for dbt --defer --state <defer_path>.
+        config: Optional already-loaded configuration for dbt_project_path. Callers
+            building several commands in one run pass it to avoid reloading.
+        commit_hashes: Optional (full, abbreviated) commit hashes already resolved
+            for gitref. Callers building several commands for the same gitref in
+            one run pass them to avoid re-running git.
+        repo_path: Optional git repository root containing dbt_project_path, if
+            the caller has already looked it up.
+        resolved_environments: Optional memo passed to resolve_environment so
+            several commands built from the same config resolve each
+            environment once.
 
     Returns:
         List[str]: The dbt command argument list suitable for subprocess execution.
@@ -58,8 +77,8 @@ def dbt_command(
 
     # Load & resolve configuration
     try:
-        cfg = load_config(dbt_project_path)
-        env_spec = resolve_environment(cfg, active_environment)
+        cfg = config if config is not None else load_config(dbt_project_path)
+        env_spec = resolve_environment(cfg, active_environment, resolved_environments)
     except ConfigError as e:
         raise ValueError(str(e)) from e
 
@@ -79,10 +98,9 @@ def dbt_command(
                 "Cannot run an isolated build without a resolvable environment (no default set?)."
             )
 
-        repo_path = get_repo_path(dbt_project_path)
-        full_commit_hash = get_full_commit_hash(repo_path, gitref)
-        short_hash = get_short_commit_hash(repo_path, gitref)
-        isolated_build_path = repo_path / ".dot" / "build" / short_hash
+        repo_path = repo_path or get_repo_path(dbt_project_path)
+        full_commit_hash, short_hash = commit_hashes or get_commit_hashes(repo_path, gitref)
+        isolated_build_path = repo_path.joinpath(".dot", "build", short_hash)
 
         worktree_path = isolated_build_path / "worktree"
         commit_file = isolated_build_path / "commit"
@@ -105,7 +123,7 @@ def dbt_command(
                 f"dbt_project.yml does not exist in worktree: {dbt_project_path / 'dbt_project.yml'}"
             )
 
-        isolated_environment_path = isolated_build_path / "env" / env_spec.name
+        isolated_environment_path = isolated_build_path.joinpath("env", env_spec.name)
 
         write_isolated_profiles_yml(
             dbt_project_path,
@@ -129,11 +147,14 @@ def dbt_command(
 
     dbt_cmd = _dbt_command(dbt_command_name, env_args, passthrough_args)
 
-    logger.debug(
-        f"[bold]dbt_project_path:[/] {isolated_dbt_project_path if gitref else dbt_project_path}",
-    )
-    logger.debug("[bold]Resolved dot Environment Config:[/]")
-    logger.debug(json.dumps(env_args, indent=2))
+    # Skip building the pretty-printed dump entirely unless it will be shown
+    if logger.isEnabledFor(logging.DEBUG):
+        import json
+        logger.debug(
+            f"[bold]dbt_project_path:[/] {isolated_dbt_project_path if gitref else dbt_project_path}",
+        )
+        logger.debug("[bold]Resolved dot Environment Config:[/]")
+        logger.debug(json.dumps(env_args, indent=2))
 
     return dbt_cmd
 
@@ -155,26 +176,46 @@ def _dbt_command(
     into a single --vars=... argument if present.
     """
     # Late filtering (after any mutations in dbt_command)
-    allowed = set(a.lstrip("-") for a in DBT_COMMAND_ARGS.get(dbt_command_name, []))
-    environment = {k: v for k, v in environment.items() if k == "vars" or k in allowed}
+    allowed = DBT_COMMAND_ARG_NAMES.get(dbt_command_name, frozenset())
 
     dbt_cmd: List[str] = ["dbt", dbt_command_name]
 
-    vars_dict = environment.get("vars", {})
-    # exclude vars from normal key->arg generation
-    env_no_vars = {k: v for k, v in environment.items() if k != "vars"}
-
+    vars_dict = environment.get("vars")
     if isinstance(vars_dict, dict) and len(vars_dict) > 0:
-        vars_json = json.dumps(vars_dict)
+        vars_json = _vars_json(vars_dict)
         dbt_cmd.append(f"--vars={vars_json}")
 
-    for k, v in env_no_vars.items():
+    # vars are excluded from normal key->arg generation
+    dbt_cmd.extend(_cli_flags(
+        (k, v) for k, v in environment.items() if k != "vars" and k in allowed
+    ))
+
+    dbt_cmd.extend(passthrough_args)
+    return dbt_cmd
+
+def _vars_json(vars_dict: dict[str, Any]) -> str:
+    """
+    Serialize vars for --vars. Uses orjson when installed, otherwise the
+    stdlib encoder with its default settings.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(vars_dict, option=orjson.OPT_NON_STR_KEYS).decode()
+        except TypeError:
+            # Let the stdlib encoder handle (or report) anything orjson rejects
+            pass
+    import json
+    return json.dumps(vars_dict)
+
+def _cli_flags(items: Iterable[tuple[str, Any]]) -> Iterator[str]:
+    """
+    Yield dbt CLI tokens for (name, value) pairs. True booleans become bare
+    flags; False, None and empty strings are dropped.
+    """
+    for k, v in items:
         if isinstance(v, bool):
             if v:
-                dbt_cmd.append(f"--{k}")
+                yield f"--{k}"
         elif v is not None and v != "":
-            dbt_cmd.append(f"--{k}")
-            dbt_cmd.append(str(v))
-
-    dbt_cmd += passthrough_args
-    return dbt_cmd
+            yield f"--{k}"
+            yield str(v)
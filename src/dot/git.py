@@ -1,3 +1,4 @@
+import os
 import subprocess
 from pathlib import Path
 
@@ -85,6 +86,33 @@ def get_short_commit_hash(repo_path: Path, gitref: str) -> str:
     return short_hash
 
 
+def get_commit_hashes(repo_path: Path, gitref: str) -> tuple[str, str]:
+    """
+    Resolve a git ref to both its full and abbreviated commit hash with a
+    single `git rev-parse` call.
+
+    Args:
+        repo_path (Path): Path to the repository root.
+        gitref (str): A ref: branch, tag, full/short hash, reflog expr, etc.
+
+    Returns:
+        tuple[str, str]: (40‑character hash, abbreviated hash as chosen by git).
+
+    Raises:
+        ValueError: If the ref cannot be resolved.
+    """
+    try:
+        # rev-parse applies --short to the arguments that follow it only
+        output = _run_git(repo_path, "rev-parse", gitref, "--short", gitref)
+    except Exception as e:
+        raise ValueError(f"Could not resolve git ref '{gitref}': {e}")
+
+    full_hash, _, short_hash = output.partition("\n")
+    if len(full_hash) != 40:
+        raise ValueError(f"Resolved hash for '{gitref}' is not 40 chars: {full_hash}")
+    return full_hash, short_hash.strip()
+
+
 def create_worktree(
     repo_path: Path,
     worktree_path: Path,
@@ -103,10 +131,10 @@ def create_worktree(
     Raises:
         RuntimeError: If the worktree cannot be created.
     """
-    if worktree_path.exists():
+    if os.path.isdir(worktree_path):
         return
 
-    worktree_path.parent.mkdir(parents=True, exist_ok=True)
+    os.makedirs(worktree_path.parent, exist_ok=True)
 
     result = subprocess.run(
         ["git", "worktree", "add", "--detach", str(worktree_path), full_commit_hash],
@@ -1,7 +1,7 @@
-import yaml
-import json
-import subprocess
+import functools
+import os
 from pathlib import Path
+from typing import Optional
 
 from . import logging
 
@@ -13,6 +13,7 @@ def write_isolated_profiles_yml(
     isolated_environment_path: Path,
     short_hash: str,
     active_environment: str,
+    profiles_yml_path: Optional[Path] = None,
 ) -> None:
     """
     Write a dbt profiles.yml for an isolated schema build.
@@ -23,6 +24,8 @@ def write_isolated_profiles_yml(
         isolated_environment_path (Path): Path where profiles.yml will be written.
         short_hash (str): The short commit hash.
         active_environment (str): The dbt environment/target name to use.
+        profiles_yml_path (Optional[Path]): The profiles.yml to read. Located
+            with `_profiles_yml_path` when not given.
     """
 
     # TODO: The user may pass a profile name on the command line. We need to source 
@@ -31,34 +34,82 @@ def write_isolated_profiles_yml(
     #   --profile TEXT   Which existing profile to load. Overrides
     #                    setting in dbt_project.yml.
 
+    import yaml  # Local import: only isolated builds need it
+    # Prefer the LibYAML-backed loader/dumper when PyYAML was built with it.
+    try:
+        from yaml import CSafeLoader as Loader, CSafeDumper as Dumper
+    except ImportError:
+        from yaml import SafeLoader as Loader, SafeDumper as Dumper
+
     # Get the profile name from dbt_project.yml
     dbt_project_yml_path = dbt_project_path / "dbt_project.yml"
-    with open(dbt_project_yml_path, "r") as f:
-        dbt_project = yaml.safe_load(f)
-    profile_name = dbt_project.get("profile")
+    st = dbt_project_yml_path.stat()
+    profile_name = _dbt_project_profile_name(str(dbt_project_yml_path), st.st_mtime_ns, st.st_size)
 
     if not profile_name:
         raise ValueError(f"Profile name not found in: {dbt_project_yml_path}")
 
     # We read the profiles.yml from the original dbt project, because this
     # is the actively configured dbt profile for the end user of dot.
-    profiles_yml_path = _profiles_yml_path(dbt_project_path, active_environment)
-    with open(profiles_yml_path, "r") as f:
-        all_profiles = yaml.safe_load(f)
+    if profiles_yml_path is None:
+        profiles_yml_path = _profiles_yml_path(dbt_project_path, active_environment)
+    all_profiles = yaml.load(profiles_yml_path.read_bytes(), Loader=Loader)
+
+    new_profiles_yml = _isolate_profiles(
+        all_profiles, profile_name, short_hash, active_environment, profiles_yml_path
+    )
+
+    isolated_environment_path.mkdir(parents=True, exist_ok=True)
+
+    # Emit the whole document to bytes and write it in one call
+    (isolated_environment_path / "profiles.yml").write_bytes(
+        yaml.dump(
+            new_profiles_yml,
+            Dumper=Dumper,
+            default_flow_style=False,
+            encoding="utf-8",
+        )
+    )
+
+def _isolate_profiles(
+    all_profiles: dict,
+    profile_name: str,
+    short_hash: str,
+    active_environment: str,
+    source: Path,
+) -> dict:
+    """
+    Build the isolated profiles.yml document from parsed profiles: only
+    `profile_name` with the `active_environment` output, its schema (or
+    dataset) suffixed with `short_hash`. No I/O.
+
+    Args:
+        all_profiles (dict): Parsed contents of the user's profiles.yml.
+        profile_name (str): Profile named in dbt_project.yml.
+        short_hash (str): The short commit hash.
+        active_environment (str): The dbt environment/target name to use.
+        source (Path): Where all_profiles was read from; used in error messages.
+
+    Returns:
+        dict: The isolated profiles.yml document.
 
+    Raises:
+        ValueError: If the profile/target is missing or sets both schema and dataset.
+    """
     # Get the profile from profiles.yml
     if profile_name not in all_profiles:
-        raise ValueError(f"Profile '{profile_name}' not found in {profiles_yml_path}")
+        raise ValueError(f"Profile '{profile_name}' not found in {source}")
     profile = all_profiles[profile_name]
 
     # Get the correct output configuration
     if "outputs" not in profile:
-        raise ValueError(f"Profile '{profile_name}' does not have an 'outputs' section in {profiles_yml_path}")
+        raise ValueError(f"Profile '{profile_name}' does not have an 'outputs' section in {source}")
     
     if active_environment not in profile["outputs"]:
-        raise ValueError(f"Target '{active_environment}' not found in outputs of profile '{profile_name}' within {profiles_yml_path}")
+        raise ValueError(f"Target '{active_environment}' not found in outputs of profile '{profile_name}' within {source}")
 
-    target = profile["outputs"][active_environment]
+    # Copy so the caller's profiles are left untouched
+    target = dict(profile["outputs"][active_environment])
 
     field = "schema"
     if "schema" in target and "dataset" in target:
@@ -68,7 +119,7 @@ def write_isolated_profiles_yml(
 
     target[field] = f"{target.get(field, 'dbt')}_{short_hash}"
 
-    new_profiles_yml = {
+    return {
         profile_name: {
             "target": active_environment,
             "outputs": {
@@ -77,96 +128,73 @@ def write_isolated_profiles_yml(
         }
     }
 
-    isolated_environment_path.mkdir(parents=True, exist_ok=True)
-
-    with open(isolated_environment_path / "profiles.yml", "w") as f:
-        yaml.safe_dump(
-            new_profiles_yml,
-            f,
-            default_flow_style=False
-        )
+@functools.lru_cache(maxsize=8)
+def _dbt_project_profile_name(path: str, mtime_ns: int, size: int) -> Optional[str]:
+    """
+    Return the `profile` value from dbt_project.yml at `path`. Keyed on the
+    file's mtime and size so the isolated deps and primary commands of one
+    run parse it once, while edits are still picked up.
+    """
+    import yaml
+    try:
+        from yaml import CSafeLoader as Loader
+    except ImportError:
+        from yaml import SafeLoader as Loader
 
-EXISTING_PROFILES_YML_PATHS = {}
+    dbt_project = yaml.load(Path(path).read_bytes(), Loader=Loader)
+    return dbt_project.get("profile")
 
 def _profiles_yml_path(
     dbt_project_path: Path,
     active_environment: str
 ) -> Path:
     """
-    Detect the location of profiles.yml using dbt debug output.
+    Locate the profiles.yml dbt would use, following dbt's own precedence:
+
+      1. The environment's `profiles-dir` argument (dot_environments.yml)
+      2. The DBT_PROFILES_DIR environment variable
+      3. The current working directory, if it contains profiles.yml
+      4. ~/.dbt
+
+    This replaces running `dbt debug --config-dir`, which started a second
+    dbt process just to print the same answer.
 
     Args:
         dbt_project_path (Path): The path to the dbt project directory.
-        active_environment (str): The dbt environment/target name to use.
+        active_environment (str): The dot environment name to use.
 
     Returns:
         Path: The path to the detected profiles.yml file.
 
     Raises:
-        FileNotFoundError: If the profiles.yml location cannot be detected.
+        FileNotFoundError: If profiles.yml does not exist at the detected location.
     """
 
-    # Cache results to avoid repeated calls to `dbt debug`
-    existing_path_key = (str(dbt_project_path.resolve()), active_environment)
-    if existing_path_key in EXISTING_PROFILES_YML_PATHS:
-        return EXISTING_PROFILES_YML_PATHS[existing_path_key]
-
     # NOTE (ADR 0002):
-    # Configuration for environments & vars is now sourced from:
+    # Configuration for environments & vars is sourced from:
     #   dot_environments.yml (+ optional dot_environments.user.yml)
-    # at the project root. We intentionally DO NOT (yet) load the historical
-    # version of configuration from the isolated worktree for `dbt debug`
+    # at the project root. We intentionally DO NOT load the historical
+    # version of configuration from the isolated worktree for profiles
     # resolution because we want the active developer context (profiles location)
     # rather than historical variance. A future enhancement may optionally allow
     # resolving config from the worktree commit if reproducibility of config
     # definitions (not just code) becomes critical.
 
-    logger.debug("[blue]:detective:  Detecting profiles.yml location with `dbt debug`[/]")
-    from .dot import dbt_command
-    dbt_cmd = dbt_command(
-        dbt_command_name="debug",
-        dbt_project_path=dbt_project_path,
-        active_environment=active_environment,
-        passthrough_args=[
-            "--config-dir",
-            "--log-format", "json",
-            "--no-quiet",
-            "--log-level", "info"
-        ],
-    )
-
-    result = subprocess.run(
-        dbt_cmd,
-        check=True,
-        capture_output=True,
-        text=True
-    )
-
-    logger.debug(f"[bold]dbt debug output:[/]\n{result.stdout}")
-
-    profiles_dir = None
-    for line in result.stdout.splitlines():
-        line = line.strip()
-        if not line:
-            continue
-        try:
-            obj = json.loads(line)
-        except json.JSONDecodeError:
-            continue
-        data = obj.get("data")
-        if isinstance(data, dict) and "profiles_dir" in data:
-            profiles_dir = data["profiles_dir"]
-            break
-
-    if not profiles_dir:
-        raise FileNotFoundError("Could not parse profiles_dir from dbt debug json output.")
+    from .config import load_config, resolve_environment
+    env_spec = resolve_environment(load_config(dbt_project_path), active_environment)
 
-    path = Path(profiles_dir) / "profiles.yml"
+    profiles_dir = env_spec.args.get("profiles-dir") or os.environ.get("DBT_PROFILES_DIR")
+    if profiles_dir:
+        # dbt resolves a relative profiles dir against the working directory
+        path = Path(profiles_dir).expanduser().resolve() / "profiles.yml"
+    elif (Path.cwd() / "profiles.yml").exists():
+        path = Path.cwd() / "profiles.yml"
+    else:
+        path = Path.home() / ".dbt" / "profiles.yml"
 
     logger.debug(f"[bold]Detected profiles.yml location:[/] {path}")
 
     if path.exists():
-        EXISTING_PROFILES_YML_PATHS[existing_path_key] = path
         return path
 
     raise FileNotFoundError(f"profiles.yml not found at detected location: {path}")
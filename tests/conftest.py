@@ -0,0 +1,114 @@
+import builtins
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+
+# Identity passed per command so commits work without global git config
+_GIT_IDENTITY = ["-c", "user.email=test@example.com", "-c", "user.name=Test User"]
+
+# Stand-in for the dbt invocation in CLI tests; built once and shared
+_MOCK_DBT_CMD = [sys.executable, "-c", "print('mocked dbt')"]
+
+
+def _rev_parse(ref: str):
+    result = subprocess.run(
+        ["git", "rev-parse", "--verify", "--quiet", f"{ref}^{{commit}}"],
+        capture_output=True,
+        text=True,
+    )
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+@pytest.fixture(scope="session")
+def git_info():
+    """
+    Full commit hashes of HEAD and main (None if absent) in the checkout the
+    suite runs from, resolved once per session. Skips when git or a commit
+    is unavailable.
+    """
+    if shutil.which("git") is None:
+        pytest.skip("git is not installed")
+    info = {"HEAD": _rev_parse("HEAD"), "main": _rev_parse("main")}
+    if info["HEAD"] is None:
+        pytest.skip("Not inside a git repository with commits")
+    return info
+
+
+@pytest.fixture(scope="session")
+def _git_repo_template(tmp_path_factory):
+    """
+    A git repository with a minimal dbt_project.yml committed so HEAD
+    resolves. Built once per session; tests receive a copy via `dot_repo`.
+    """
+    template = tmp_path_factory.mktemp("git_repo_template")
+    subprocess.run(["git", "init", "-q"], cwd=template, check=True)
+    (template / "dbt_project.yml").write_bytes(b"name: test\nprofile: test\n")
+    subprocess.run(["git", "add", "dbt_project.yml"], cwd=template, check=True)
+    subprocess.run(["git", *_GIT_IDENTITY, "commit", "-q", "-m", "init"], cwd=template, check=True)
+    return template
+
+
+@pytest.fixture
+def dot_repo(tmp_path, _git_repo_template):
+    """
+    tmp_path populated with a copy of the session git repo template. Copying
+    a tiny .git is much cheaper than running git init/add/commit per test.
+    """
+    shutil.copytree(_git_repo_template, tmp_path, dirs_exist_ok=True)
+    return tmp_path
+
+
+@pytest.fixture
+def dbt_project(tmp_path, _git_repo_template):
+    """
+    tmp_path with a copy of the template's dbt_project.yml.
+    """
+    shutil.copyfile(_git_repo_template / "dbt_project.yml", tmp_path / "dbt_project.yml")
+    return tmp_path
+
+
+@pytest.fixture(scope="module")
+def mock_dbt_command():
+    """
+    Replace dot.dot.dbt_command for a whole module with a harmless command, so
+    CLI tests exercise the prompts and flow without building a real dbt call.
+    """
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr("dot.dot.dbt_command", lambda *args, **kwargs: _MOCK_DBT_CMD)
+        yield
+
+
+@pytest.fixture
+def run_cli(capsys):
+    """
+    Return a function running the dot CLI inside a directory:
+
+        run_cli(repo, argv, input_responses=None, isatty=True, patches=None, exec_dbt=False)
+
+    input_responses are answered to successive prompts (empty once exhausted);
+    sys.stdin.isatty returns isatty (interactive by default so prompts run);
+    patches maps dotted attribute paths to replacements for the run.
+    Returns (exit_code, stdout, stderr).
+    """
+    from dot.cli import app
+
+    def _run(repo, argv, input_responses=None, isatty=True, patches=None, exec_dbt=False):
+        responses = iter(input_responses or ())
+        with pytest.MonkeyPatch.context() as mp:
+            mp.setattr(sys, "argv", ["dot", *argv])
+            mp.chdir(repo)
+            mp.setattr(sys.stdin, "isatty", lambda: isatty)
+            mp.setattr(builtins, "input", lambda _: next(responses, ""))
+            for target, obj in (patches or {}).items():
+                mp.setattr(target, obj)
+            try:
+                rc = app(exec_dbt=exec_dbt)
+            except SystemExit as e:
+                rc = e.code
+        captured = capsys.readouterr()
+        return rc, captured.out, captured.err
+
+    return _run
@@ -1,130 +1,91 @@
-import os
-import sys
 from pathlib import Path
-from contextlib import ExitStack
-from unittest.mock import patch
-import io
-import json
-import pytest
-
-# Ensure src/ is on path
-sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
-
-from src.dot.cli import app
-
-def _init_git_repo(tmp_path: Path):
-    old_cwd = os.getcwd()
-    os.chdir(tmp_path)
-    try:
-        os.system("git init -q")
-    finally:
-        os.chdir(old_cwd)
 
-def _write_dbt_project(tmp_path: Path):
-    (tmp_path / "dbt_project.yml").write_text("name: test\nprofile: test\n", encoding="utf-8")
-
-def _run_cli(tmp_path: Path, argv, input_responses=None):
-    """
-    Run the CLI inside tmp_path, patching dbt_command to avoid real dbt execution.
-    input_responses: iterable of responses (strings) for successive prompts.
-    Returns (exit_code, stdout, stderr)
-    """
-    _init_git_repo(tmp_path)
-    _write_dbt_project(tmp_path)
-
-    old_cwd = os.getcwd()
-    old_argv = sys.argv
-    stdout = io.StringIO()
-    stderr = io.StringIO()
+import pytest
 
-    sys.argv = ["dot", *argv]
-    os.chdir(tmp_path)
+from dot.cli_prompts import CONFIG_REL_PATH, _gitignore_detector, _load_prompts_config
 
-    # Iterator for prompt responses
-    if input_responses is not None:
-        responses = iter(input_responses)
-        def _fake_input(_):
-            try:
-                return next(responses)
-            except StopIteration:
-                return ""
-    else:
-        _fake_input = lambda _: ""
+pytestmark = pytest.mark.usefixtures("mock_dbt_command")
 
-    with ExitStack() as stack:
-        stack.enter_context(patch("dot.dot.dbt_command", return_value=[sys.executable, "-c", "print('mocked dbt')"]))
-        stack.enter_context(patch("sys.stdin.isatty", lambda: True))
-        stack.enter_context(patch("sys.stdout", stdout))
-        stack.enter_context(patch("sys.stderr", stderr))
-        stack.enter_context(patch("builtins.input", _fake_input))
-        try:
-            rc = app()
-        except SystemExit as e:
-            rc = e.code
-        finally:
-            sys.argv = old_argv
-            os.chdir(old_cwd)
-    return rc, stdout.getvalue(), stderr.getvalue()
+def _write_gitignore(repo: Path, content: str | None):
+    if content is not None:
+        (repo / ".gitignore").write_bytes(content.encode())
 
 # ---------------------------------------------------------------------------
 # Tests
 # ---------------------------------------------------------------------------
 
-def test_gitignore_present_no_prompt(tmp_path):
-    (tmp_path / ".gitignore").write_text(".dot/\n", encoding="utf-8")
-    rc, out, err = _run_cli(tmp_path, ["build"])
-    assert rc == 0
-    # Prompt summary logged via logger; presence not asserted here
-    assert ".dot/" in (tmp_path / ".gitignore").read_text(encoding="utf-8")
+def _gitignore_has_entry(repo: Path) -> bool:
+    return ".dot/" in (repo / ".gitignore").read_text(encoding="utf-8")
 
-def test_gitignore_missing_file_never_disables(tmp_path):
-    # No .gitignore at all; choose 'e' (never)
-    rc, out, err = _run_cli(tmp_path, ["build"], input_responses=["e"])
-    assert rc == 0
-    cfg = tmp_path / ".dot" / "config.yml"
+def _check_entry_present(repo: Path):
+    assert _gitignore_has_entry(repo)
+
+def _check_entry_absent(repo: Path):
+    # Declined prompt must leave .gitignore untouched
+    assert not _gitignore_has_entry(repo)
+
+def _check_prompt_disabled(repo: Path):
+    cfg = repo / ".dot" / "config.yml"
     assert cfg.exists()
     text = cfg.read_text(encoding="utf-8")
     assert "prompts:" in text
     assert "gitignore: disabled" in text
 
-def test_gitignore_missing_entry_yes_adds(tmp_path):
-    (tmp_path / ".gitignore").write_text("# initial\n", encoding="utf-8")
-    rc, out, err = _run_cli(tmp_path, ["build"], input_responses=["y"])
+@pytest.mark.parametrize("gitignore,responses,expected_rc,check", [
+    pytest.param(".dot/\n", None, 0, _check_entry_present, id="present-no-prompt"),
+    pytest.param(None, ["e"], 0, _check_prompt_disabled, id="missing-file-never"),
+    pytest.param("# initial\n", ["y"], 0, _check_entry_present, id="missing-entry-yes"),
+    pytest.param("# test\n", ["n"], 1, _check_entry_absent, id="missing-entry-no-aborts"),
+])
+def test_gitignore_prompt(dot_repo, run_cli, gitignore, responses, expected_rc, check):
+    _write_gitignore(dot_repo, gitignore)
+    rc, out, err = run_cli(dot_repo, ["build"], input_responses=responses)
+    assert rc == expected_rc
+    check(dot_repo)
+
+def test_gitignore_missing_entry_never_disables_and_continues(dot_repo, run_cli):
+    _write_gitignore(dot_repo, "# test\n")
+    rc, out, err = run_cli(dot_repo, ["build"], input_responses=["e"])
     assert rc == 0
-    content = (tmp_path / ".gitignore").read_text(encoding="utf-8")
-    assert ".dot/" in content
-
-def test_gitignore_missing_entry_no_aborts(tmp_path):
-    (tmp_path / ".gitignore").write_text("# test\n", encoding="utf-8")
-    rc, out, err = _run_cli(tmp_path, ["build"], input_responses=["n"])
-    assert rc == 1  # mandatory prompt abort
-    # Ensure not modified
-    content = (tmp_path / ".gitignore").read_text(encoding="utf-8")
-    assert ".dot/" not in content
-
-def test_gitignore_missing_entry_never_disables_and_continues(tmp_path):
-    (tmp_path / ".gitignore").write_text("# test\n", encoding="utf-8")
-    rc, out, err = _run_cli(tmp_path, ["build"], input_responses=["e"])
-    assert rc == 0
-    cfg_text = (tmp_path / ".dot" / "config.yml").read_text(encoding="utf-8")
+    cfg_text = (dot_repo / ".dot" / "config.yml").read_text(encoding="utf-8")
     assert "gitignore: disabled" in cfg_text
     # Second run should not prompt (supply no responses)
-    rc2, out2, err2 = _run_cli(tmp_path, ["build"])
+    rc2, out2, err2 = run_cli(dot_repo, ["build"])
     assert rc2 == 0
 
-def test_global_disable_skips_gitignore_enforcement(tmp_path):
+def test_global_disable_skips_gitignore_enforcement(dot_repo, run_cli):
     # No .gitignore but global disable
-    rc, out, err = _run_cli(tmp_path, ["--disable-prompts", "build"])
+    rc, out, err = run_cli(dot_repo, ["--disable-prompts", "build"])
     assert rc == 0
     # No config file produced (feature not prompted)
-    assert not (tmp_path / ".dot" / "config.yml").exists()
+    assert not (dot_repo / ".dot" / "config.yml").exists()
 
-def test_gitignore_yes_then_idempotent_second_run(tmp_path):
-    (tmp_path / ".gitignore").write_text("# header\n", encoding="utf-8")
-    rc, out, err = _run_cli(tmp_path, ["build"], input_responses=["y"])
+def test_gitignore_yes_then_idempotent_second_run(dot_repo, run_cli):
+    _write_gitignore(dot_repo, "# header\n")
+    rc, out, err = run_cli(dot_repo, ["build"], input_responses=["y"])
     assert rc == 0
-    rc2, out2, err2 = _run_cli(tmp_path, ["build"])
+    rc2, out2, err2 = run_cli(dot_repo, ["build"])
     assert rc2 == 0
     # Ensure single entry (avoid duplicates)
-    lines = [l.strip() for l in (tmp_path / ".gitignore").read_text(encoding="utf-8").splitlines() if l.strip()]
+    lines = [l.strip() for l in (dot_repo / ".gitignore").read_text(encoding="utf-8").splitlines() if l.strip()]
     assert lines.count(".dot/") == 1
+
+@pytest.mark.parametrize("content,expected", [
+    (".dot/\n", "COMPLIANT"),
+    (".dot", "COMPLIANT"),
+    ("# header\r\n  .dot  \r\nnode_modules/\r\n", "COMPLIANT"),
+    ("target/\n.dot/\n", "COMPLIANT"),
+    ("", "NEEDS_ACTION"),
+    (".dotfiles/\n", "NEEDS_ACTION"),
+    ("# .dot/\n", "NEEDS_ACTION"),
+    ("/x/.dot/\n", "NEEDS_ACTION"),
+])
+def test_gitignore_detector_entry_matching(tmp_path, content, expected):
+    (tmp_path / ".gitignore").write_text(content, encoding="utf-8", newline="")
+    assert _gitignore_detector(tmp_path, {}, False).value == expected
+
+def test_prompts_config_missing_or_unreadable_treated_as_empty(tmp_path):
+    assert _load_prompts_config(tmp_path) == {}
+    # A directory where the config file should be is warned about, not raised
+    (tmp_path / CONFIG_REL_PATH).mkdir(parents=True)
+    assert _load_prompts_config(tmp_path) == {}
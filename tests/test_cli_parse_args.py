@@ -0,0 +1,77 @@
+import sys
+import pytest
+
+from dot.cli import _build_parser, _fast_parse_args, _split_passthrough, parse_args, parse_env_gitref
+
+# ---------------------------------------------------------------------------
+# Tests
+# ---------------------------------------------------------------------------
+
+@pytest.mark.parametrize("cli_args", [
+    ["build"],
+    ["build", "dev"],
+    ["build", "dev@HEAD"],
+    ["-v", "run", "prod"],
+    ["build", "dev", "--verbose", "--dry-run"],
+    ["--no-deps", "build", "dev@HEAD", "--defer", "prod@HEAD"],
+    ["--disable-prompts", "--defer", "@main", "test"],
+    ["build", "--defer", "a", "--defer", "b"],
+    ["run-operation", ""],
+])
+def test_fast_parse_matches_argparse(cli_args):
+    fast = _fast_parse_args(cli_args)
+    assert fast is not None
+    assert vars(fast) == vars(_build_parser().parse_args(cli_args))
+
+
+@pytest.mark.parametrize("cli_args", [
+    [],
+    ["-h"],
+    ["--help"],
+    ["not-a-command"],
+    ["build", "dev", "extra"],
+    ["build", "-v", "dev"],          # argparse rejects positionals split by options
+    ["--dry", "build"],              # abbreviations are argparse's job
+    ["--defer=prod@HEAD", "build"],
+    ["build", "--defer"],
+    ["build", "--defer", "-v"],
+    ["-vv", "build"],
+])
+def test_fast_parse_defers_to_argparse(cli_args):
+    assert _fast_parse_args(cli_args) is None
+
+
+def test_parse_args_rejects_unknown_dbt_command(monkeypatch, capsys):
+    monkeypatch.setattr(sys, "argv", ["dot", "--dry-run", "not-a-command"])
+    with pytest.raises(SystemExit) as exc:
+        parse_args()
+    assert exc.value.code == 2
+    assert "invalid choice: 'not-a-command'" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("argv, expected", [
+    (["build", "dev"], (["build", "dev"], [])),
+    (["build", "--", "--select", "x"], (["build"], ["--select", "x"])),
+    (["build", "--", "--", "y"], (["build"], ["--", "y"])),
+    (["--"], ([], [])),
+])
+def test_split_passthrough(argv, expected):
+    assert _split_passthrough(argv) == expected
+
+
+@pytest.mark.parametrize("spec, expected", [
+    (None, (None, None)),
+    ("dev", ("dev", None)),
+    ("dev@HEAD", ("dev", "HEAD")),
+    ("@HEAD", (None, "HEAD")),
+    ("dev@", ("dev", None)),
+    (" dev @ main ", ("dev", "main")),
+    ("", (None, None)),
+])
+def test_parse_env_gitref(spec, expected):
+    assert parse_env_gitref(spec) == expected
+
+
+def test_parse_env_gitref_rejects_multiple_separators():
+    with pytest.raises(ValueError, match="multiple '@'"):
+        parse_env_gitref("dev@main@HEAD")
@@ -1,13 +1,10 @@
-import sys
 import pytest
 import logging
 import textwrap
 from pathlib import Path
 
-# Ensure src/ is on the Python path for imports
-sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
-
-from src.dot.config import (
+from dot import config as config_module
+from dot.config import (
     load_config,
     resolve_environment,
     dbt_cli_args,
@@ -17,24 +14,34 @@ from src.dot.config import (
     PROJECT_VARIABLES_FILENAME,
 )
 
+# Every test runs against tmp_path holding a shared dbt_project.yml (see conftest)
+pytestmark = pytest.mark.usefixtures("dbt_project")
+
 # -----------------------------------------------------------------------------
 # Helpers
 # -----------------------------------------------------------------------------
 
-def write(project_root: Path, name: str, content: str):
-    p = project_root / name
-    p.write_text(textwrap.dedent(content).lstrip(), encoding="utf-8")
-    return p
+# Project config with a single default 'dev' environment, shared by many tests
+_DEV_ONLY_CFG = textwrap.dedent("""
+    environment:
+      default: dev
+      dev:
+        target: dev
+""").lstrip()
 
-def minimal_dbt_project(tmp_path: Path):
-    (tmp_path / "dbt_project.yml").write_text("name: test\nprofile: test\n", encoding="utf-8")
+def write_configs(project_root: Path, files: dict):
+    """
+    Write each {filename: yaml} entry into project_root; contents are
+    dedented so they can be written inline as indented triple-quoted strings.
+    """
+    for name, content in files.items():
+        (project_root / name).write_text(textwrap.dedent(content).lstrip(), encoding="utf-8")
 
 # -----------------------------------------------------------------------------
 # Tests
 # -----------------------------------------------------------------------------
 
 def test_load_config_no_files(tmp_path):
-    minimal_dbt_project(tmp_path)
     cfg = load_config(tmp_path)
     assert cfg.variables == {}
     # raw_environments removed; project_environments & user_environments should both be empty
@@ -45,24 +52,33 @@ def test_load_config_no_files(tmp_path):
     assert env.args == {}
     assert env.vars == {}
 
+def test_load_config_project_root_not_a_directory(tmp_path):
+    cfg = load_config(tmp_path / "dbt_project.yml")
+    assert cfg.project_environments == {}
+    assert cfg.user_environments == {}
+    assert cfg.variables == {}
+
+def test_load_config_unlistable_project_root_reads_files_by_name(tmp_path, monkeypatch):
+    write_configs(tmp_path, {PROJECT_CONFIG_FILENAME: _DEV_ONLY_CFG})
+
+    def _denied(path):
+        raise PermissionError(13, "Permission denied", str(path))
+
+    monkeypatch.setattr(config_module.os, "scandir", _denied)
+    cfg = load_config(tmp_path)
+    assert resolve_environment(cfg, None).name == "dev"
+
 def test_load_config_with_project_files_split(tmp_path):
-    minimal_dbt_project(tmp_path)
-    write(
-        tmp_path,
-        PROJECT_VARIABLES_FILENAME,
-        """
+    write_configs(tmp_path, {
+        PROJECT_VARIABLES_FILENAME: """
         vars:
           feature_flag:
             description: Test flag
             values: [true, false]
             strict: true
             required: true
-        """
-    )
-    write(
-        tmp_path,
-        PROJECT_CONFIG_FILENAME,
-        """
+        """,
+        PROJECT_CONFIG_FILENAME: """
         environment:
           default: dev
           all:
@@ -70,8 +86,8 @@ def test_load_config_with_project_files_split(tmp_path):
               feature_flag: true
           dev:
             target: dev
-        """
-    )
+        """,
+    })
     cfg = load_config(tmp_path)
     assert "feature_flag" in cfg.variables
     assert cfg.default_environment == "dev"
@@ -81,11 +97,8 @@ def test_load_config_with_project_files_split(tmp_path):
     assert env.vars["feature_flag"] is True
 
 def test_user_config_merging(tmp_path):
-    minimal_dbt_project(tmp_path)
-    write(
-        tmp_path,
-        PROJECT_CONFIG_FILENAME,
-        """
+    write_configs(tmp_path, {
+        PROJECT_CONFIG_FILENAME: """
         environment:
           default: dev
           all:
@@ -96,12 +109,8 @@ def test_user_config_merging(tmp_path):
             target: dev
             vars:
               flag_a: true
-        """
-    )
-    write(
-        tmp_path,
-        USER_CONFIG_FILENAME,
-        """
+        """,
+        USER_CONFIG_FILENAME: """
         environment:
           all:
             threads: 8
@@ -109,8 +118,8 @@ def test_user_config_merging(tmp_path):
             target: dev_override
             vars:
               flag_b: 123
-        """
-    )
+        """,
+    })
     cfg = load_config(tmp_path)
     env = resolve_environment(cfg, "dev")
     # threads overridden
@@ -121,116 +130,225 @@ def test_user_config_merging(tmp_path):
     assert env.vars["flag_a"] is True
     assert env.vars["flag_b"] == 123
 
-def test_required_variable_missing_raises(tmp_path):
-    minimal_dbt_project(tmp_path)
-    write(
-        tmp_path,
-        PROJECT_VARIABLES_FILENAME,
-        """
-        vars:
-          must_set:
-            required: true
-        """
-    )
-    write(
-        tmp_path,
-        PROJECT_CONFIG_FILENAME,
-        """
-        environment:
-          default: dev
-          dev:
-            target: dev
-        """
-    )
-    cfg = load_config(tmp_path)
-    with pytest.raises(ConfigError) as exc:
-        resolve_environment(cfg, "dev")
-    assert "Required variable 'must_set'" in str(exc.value)
-
-def test_required_variable_satisfied_via_all(tmp_path):
-    minimal_dbt_project(tmp_path)
-    write(
-        tmp_path,
-        PROJECT_VARIABLES_FILENAME,
-        """
-        vars:
-          must_set:
-            required: true
-        """
-    )
-    write(
-        tmp_path,
-        PROJECT_CONFIG_FILENAME,
-        """
-        environment:
-          default: dev
-          all:
+@pytest.mark.parametrize("files, env_name, message", [
+    pytest.param(
+        {
+            PROJECT_VARIABLES_FILENAME: """
             vars:
-              must_set: 42
-          dev:
-            target: dev
-        """
-    )
-    cfg = load_config(tmp_path)
-    env = resolve_environment(cfg, "dev")
-    assert env.vars["must_set"] == 42
-
-def test_strict_variable_invalid_value(tmp_path):
-    minimal_dbt_project(tmp_path)
-    write(
-        tmp_path,
-        PROJECT_VARIABLES_FILENAME,
-        """
-        vars:
-          color:
-            values: [red, blue]
-            strict: true
-        """
-    )
-    write(
-        tmp_path,
-        PROJECT_CONFIG_FILENAME,
-        """
-        environment:
-          default: dev
-          dev:
-            target: dev
+              must_set:
+                required: true
+            """,
+            PROJECT_CONFIG_FILENAME: _DEV_ONLY_CFG,
+        },
+        "dev",
+        "Required variable 'must_set'",
+        id="required-variable-missing",
+    ),
+    pytest.param(
+        {
+            PROJECT_VARIABLES_FILENAME: """
             vars:
-              color: green
-        """
-    )
-    cfg = load_config(tmp_path)
-    with pytest.raises(ConfigError) as exc:
-        resolve_environment(cfg, "dev")
-    assert "Variable 'color' has invalid value" in str(exc.value)
-
-def test_environment_not_found_logs_detail(tmp_path, caplog):
-    minimal_dbt_project(tmp_path)
-    write(
-        tmp_path,
-        PROJECT_CONFIG_FILENAME,
-        """
-        environment:
-          default: dev
-          dev:
-            target: dev
-        """
-    )
-    with caplog.at_level(logging.DEBUG, logger="dot.config"):
+              color:
+                values: [red, blue]
+                strict: true
+            """,
+            PROJECT_CONFIG_FILENAME: """
+            environment:
+              default: dev
+              dev:
+                target: dev
+                vars:
+                  color: green
+            """,
+        },
+        "dev",
+        "Variable 'color' has invalid value",
+        id="strict-variable-invalid-value",
+    ),
+    pytest.param(
+        {
+            PROJECT_CONFIG_FILENAME: """
+            vars:
+              some_var:
+                required: true
+            environment:
+              default: dev
+              dev:
+                target: dev
+            """,
+        },
+        None,
+        "Root-level 'vars' found",
+        id="root-level-vars-in-environments-file",
+    ),
+    pytest.param(
+        {
+            PROJECT_CONFIG_FILENAME: _DEV_ONLY_CFG,
+            USER_CONFIG_FILENAME: """
+            vars:
+              some_var:
+                required: true
+            environment:
+              dev:
+                target: dev
+            """,
+        },
+        None,
+        "Root-level 'vars' found",
+        id="root-level-vars-in-user-file",
+    ),
+])
+def test_invalid_config_raises(tmp_path, files, env_name, message):
+    """
+    env_name=None: load_config itself must reject the files.
+    Otherwise loading succeeds and resolving env_name raises.
+    """
+    write_configs(tmp_path, files)
+    if env_name is None:
+        with pytest.raises(ConfigError) as exc:
+            load_config(tmp_path)
+    else:
         cfg = load_config(tmp_path)
         with pytest.raises(ConfigError) as exc:
-            resolve_environment(cfg, "missing_env")
+            resolve_environment(cfg, env_name)
+    assert message in str(exc.value)
+
+@pytest.mark.parametrize("files, var_name, expected", [
+    pytest.param(
+        {
+            PROJECT_VARIABLES_FILENAME: """
+            vars:
+              must_set:
+                required: true
+            """,
+            PROJECT_CONFIG_FILENAME: """
+            environment:
+              default: dev
+              all:
+                vars:
+                  must_set: 42
+              dev:
+                target: dev
+            """,
+        },
+        "must_set",
+        42,
+        id="required-satisfied-via-all",
+    ),
+    pytest.param(
+        {
+            PROJECT_VARIABLES_FILENAME: """
+            vars:
+              feature_flag:
+                required: true
+            """,
+            PROJECT_CONFIG_FILENAME: """
+            environment:
+              default: dev
+              all:
+                vars:
+                  feature_flag: true
+              dev:
+                target: dev
+            """,
+        },
+        "feature_flag",
+        True,
+        id="required-missing-in-specific-but-in-all",
+    ),
+    pytest.param(
+        {
+            PROJECT_CONFIG_FILENAME: """
+            environment:
+              default: dev
+              all:
+                vars:
+                  feature: base
+              dev:
+                target: dev
+                vars:
+                  feature: overridden
+            """,
+        },
+        "feature",
+        "overridden",
+        id="project-env-overrides-project-all",
+    ),
+    pytest.param(
+        {
+            PROJECT_CONFIG_FILENAME: """
+            environment:
+              default: dev
+              all:
+                vars:
+                  feature: 1
+              dev:
+                vars:
+                  feature: 2
+            """,
+            USER_CONFIG_FILENAME: """
+            environment:
+              all:
+                vars:
+                  feature: 3
+            """,
+        },
+        "feature",
+        3,
+        # all from user config overrides all from project config
+        id="user-all-overrides-project-env",
+    ),
+    pytest.param(
+        {
+            PROJECT_CONFIG_FILENAME: """
+            environment:
+              default: dev
+              all:
+                vars:
+                  feature: 1
+              dev:
+                vars:
+                  feature: 2
+            """,
+            USER_CONFIG_FILENAME: """
+            environment:
+              all:
+                vars:
+                  feature: 3
+              dev:
+                vars:
+                  feature: 4
+            """,
+        },
+        "feature",
+        4,
+        # Specific env in user config should take precedence over all
+        id="user-env-overrides-user-all",
+    ),
+])
+def test_environment_var_precedence(tmp_path, files, var_name, expected):
+    write_configs(tmp_path, files)
+    env = resolve_environment(load_config(tmp_path), "dev")
+    assert env.name == "dev"
+    assert env.vars[var_name] == expected
+    assert type(env.vars[var_name]) is type(expected)
+
+def test_environment_not_found_logs_detail(tmp_path, caplog):
+    write_configs(tmp_path, {PROJECT_CONFIG_FILENAME: _DEV_ONLY_CFG})
+    # Only dot.config is lowered to DEBUG; restored automatically at teardown
+    caplog.set_level(logging.DEBUG, logger="dot.config")
+    cfg = load_config(tmp_path)
+    with pytest.raises(ConfigError) as exc:
+        resolve_environment(cfg, "missing_env")
 
     assert "Environment 'missing_env' not found" in str(exc.value)
     # Ensure diagnostic info about presence of config files was logged
-    assert any("Loading dot configuration for" in m for m in caplog.messages)
+    config_log = "\n".join(r.getMessage() for r in caplog.records if r.name == "dot.config")
+    assert "Loading dot configuration for" in config_log
 
 def test_dbt_cli_args_filtering(tmp_path):
-    minimal_dbt_project(tmp_path)
-    write(
-        tmp_path,
-        PROJECT_CONFIG_FILENAME,
-        """
+    write_configs(tmp_path, {
+        PROJECT_CONFIG_FILENAME: """
         environment:
           default: dev
           dev:
@@ -239,8 +357,8 @@ def test_dbt_cli_args_filtering(tmp_path):
             bogus: should_not_pass
             vars:
               example: 1
-        """
-    )
+        """,
+    })
     cfg = load_config(tmp_path)
     env = resolve_environment(cfg, "dev")
     args = dbt_cli_args("run", env)
@@ -253,17 +371,14 @@ def test_dbt_cli_args_filtering(tmp_path):
     assert args["vars"]["example"] == 1
 
 def test_empty_environment_section(tmp_path):
-    minimal_dbt_project(tmp_path)
     # Only variables file exists, no environments file.
-    write(
-        tmp_path,
-        PROJECT_VARIABLES_FILENAME,
-        """
+    write_configs(tmp_path, {
+        PROJECT_VARIABLES_FILENAME: """
         vars:
           something:
             required: false
-        """
-    )
+        """,
+    })
     cfg = load_config(tmp_path)
     env = resolve_environment(cfg, None)
     assert env.name is None
@@ -271,26 +386,14 @@ def test_empty_environment_section(tmp_path):
     assert env.vars == {}
 
 def test_user_config_adds_new_environment(tmp_path):
-    minimal_dbt_project(tmp_path)
-    write(
-        tmp_path,
-        PROJECT_CONFIG_FILENAME,
-        """
-        environment:
-          default: dev
-          dev:
-            target: dev
-        """
-    )
-    write(
-        tmp_path,
-        USER_CONFIG_FILENAME,
-        """
+    write_configs(tmp_path, {
+        PROJECT_CONFIG_FILENAME: _DEV_ONLY_CFG,
+        USER_CONFIG_FILENAME: """
         environment:
           staging:
             target: staging_target
-        """
-    )
+        """,
+    })
     cfg = load_config(tmp_path)
     # new environment only defined in user config
     env = resolve_environment(cfg, "staging")
@@ -298,167 +401,66 @@ def test_user_config_adds_new_environment(tmp_path):
     assert env.args["target"] == "staging_target"
 
 
-def test_environment_all_precedence_user(tmp_path):
-    minimal_dbt_project(tmp_path)
-    write(
-        tmp_path,
-        PROJECT_CONFIG_FILENAME,
-        """
-        environment:
-          default: dev
-          all:
-            vars:
-              feature: 1
-          dev:
-            vars:
-              feature: 2
-        """
-    )
-    write(
-        tmp_path,
-        USER_CONFIG_FILENAME,
-        """
-        environment:
-          all:
-            vars:
-              feature: 3
-        """
-    )
+def test_load_config_picks_up_file_changes_and_isolates_callers(tmp_path):
+    write_configs(tmp_path, {PROJECT_CONFIG_FILENAME: _DEV_ONLY_CFG})
     cfg = load_config(tmp_path)
-    # all from user config overrides all from project config
-    env = resolve_environment(cfg, "dev")
-    assert env.name == "dev"
-    assert env.vars["feature"] == 3
-
-def test_environment_all_precedence_user_specific(tmp_path):
-    minimal_dbt_project(tmp_path)
-    write(
-        tmp_path,
-        PROJECT_CONFIG_FILENAME,
-        """
+    # Mutating a loaded config must not affect subsequent loads
+    cfg.project_environments["dev"]["target"] = "mutated"
+    assert load_config(tmp_path).project_environments["dev"]["target"] == "dev"
+
+    write_configs(tmp_path, {
+        PROJECT_CONFIG_FILENAME: """
         environment:
           default: dev
-          all:
-            vars:
-              feature: 1
-          dev:
-            vars:
-              feature: 2
-        """
-    )
-    write(
-        tmp_path,
-        USER_CONFIG_FILENAME,
-        """
-        environment:
-          all:
-            vars:
-              feature: 3
           dev:
-            vars:
-              feature: 4
-        """
-    )
-    cfg = load_config(tmp_path)
-    # Specific env in user config should take precedence over all
-    env = resolve_environment(cfg, "dev")
-    assert env.name == "dev"
-    assert env.vars["feature"] == 4
-
-def test_environment_vars_merge_precedence(tmp_path):
-    minimal_dbt_project(tmp_path)
-    write(
-        tmp_path,
-        PROJECT_CONFIG_FILENAME,
-        """
+            target: dev_changed
+        """,
+    })
+    assert load_config(tmp_path).project_environments["dev"]["target"] == "dev_changed"
+
+
+def test_load_config_reuses_cached_config_while_files_unchanged(tmp_path, monkeypatch):
+    write_configs(tmp_path, {PROJECT_CONFIG_FILENAME: _DEV_ONLY_CFG})
+    first = load_config(tmp_path)
+
+    def _fail(*args, **kwargs):
+        raise AssertionError("config files re-read despite no changes")
+
+    monkeypatch.setattr(config_module, "_read_yaml_optional", _fail)
+    second = load_config(tmp_path)
+    assert second == first
+    assert second is not first
+    assert second.project_environments is not first.project_environments
+
+
+def test_resolve_environment_memo_reused_and_isolated(tmp_path):
+    write_configs(tmp_path, {
+        PROJECT_CONFIG_FILENAME: """
         environment:
           default: dev
-          all:
-            vars:
-              feature: base
           dev:
             target: dev
+            select: [model_a]
             vars:
-              feature: overridden
-        """
-    )
+              nested:
+                key: original
+        """,
+    })
     cfg = load_config(tmp_path)
-    env = resolve_environment(cfg, "dev")
-    assert env.vars["feature"] == "overridden"
-
-def test_required_variable_missing_in_specific_but_in_all_is_ok(tmp_path):
-    minimal_dbt_project(tmp_path)
-    write(
-        tmp_path,
-        PROJECT_VARIABLES_FILENAME,
-        """
-        vars:
-          feature_flag:
-            required: true
-        """
-    )
-    write(
-        tmp_path,
-        PROJECT_CONFIG_FILENAME,
-        """
-        environment:
-          default: dev
-          all:
-            vars:
-              feature_flag: true
-          dev:
-            target: dev
-        """
-    )
-    cfg = load_config(tmp_path)
-    env = resolve_environment(cfg, "dev")
-    assert env.vars["feature_flag"] is True
+    memo = {}
+    first = resolve_environment(cfg, None, memo)
+    first.args["target"] = "mutated"
+    first.args["select"].append("model_b")
+    first.vars["nested"]["key"] = "mutated"
 
-
-def test_root_level_vars_in_environments_file_raises(tmp_path):
-    minimal_dbt_project(tmp_path)
-    write(
-        tmp_path,
-        PROJECT_CONFIG_FILENAME,
-        """
-        vars:
-          some_var:
-            required: true
-        environment:
-          default: dev
-          dev:
-            target: dev
-        """
-    )
-    with pytest.raises(ConfigError) as exc:
-        load_config(tmp_path)
-    assert "Root-level 'vars' found" in str(exc.value)
+    second = resolve_environment(cfg, "dev", memo)
+    assert second.args == {"target": "dev", "select": ["model_a"]}
+    assert second.vars == {"nested": {"key": "original"}}
+    assert list(memo) == ["dev"]
 
 
-def test_root_level_vars_in_user_file_raises(tmp_path):
-    minimal_dbt_project(tmp_path)
-    write(
-        tmp_path,
-        PROJECT_CONFIG_FILENAME,
-        """
-        environment:
-          default: dev
-          dev:
-            target: dev
-        """
-    )
-    write(
-        tmp_path,
-        USER_CONFIG_FILENAME,
-        """
-        vars:
-          some_var:
-            required: true
-        environment:
-          dev:
-            target: dev
-        """
-    )
-    with pytest.raises(ConfigError) as exc:
-        load_config(tmp_path)
-    assert "Root-level 'vars' found" in str(exc.value)
+def test_load_config_skips_debug_detail_when_not_enabled(tmp_path, caplog):
+    caplog.set_level(logging.INFO, logger="dot.config")
+    load_config(tmp_path)
+    assert str(tmp_path.resolve()) not in config_module._logged_config_roots
+    assert not [r for r in caplog.records if r.name == "dot.config"]
@@ -0,0 +1,73 @@
+import json
+import pytest
+
+from dot import dot as dot_module
+from dot.dot import _dbt_command, _vars_json
+
+# -----------------------------------------------------------------------------
+# Tests
+# -----------------------------------------------------------------------------
+
+def test_dbt_command_builds_flags_in_environment_order():
+    cmd = _dbt_command(
+        "build",
+        {
+            "target": "dev",
+            "vars": {"a": 1, "b": [1, 2]},
+            "select": "my_model",
+            "defer": True,
+            "favor-state": False,
+            "exclude": "",
+            "state": None,
+        },
+        ["--full-refresh"],
+    )
+    assert cmd[:2] == ["dbt", "build"]
+    assert cmd[2].startswith("--vars=")
+    assert json.loads(cmd[2][len("--vars="):]) == {"a": 1, "b": [1, 2]}
+    assert cmd[3:] == ["--target", "dev", "--select", "my_model", "--defer", "--full-refresh"]
+
+def test_dbt_command_filters_disallowed_args_and_empty_vars():
+    cmd = _dbt_command(
+        "deps",
+        {"target": "dev", "select": "my_model", "bogus": "x", "vars": {}},
+        [],
+    )
+    assert cmd == ["dbt", "deps", "--target", "dev"]
+
+def test_dbt_command_uses_supplied_commit_hashes(dot_repo, monkeypatch):
+    (dot_repo / "dot_environments.yml").write_bytes(b"environment:\n  default: dev\n  dev: {}\n")
+
+    def _no_git(repo, ref):
+        raise AssertionError("gitref resolved again")
+
+    def _fake_create_worktree(repo, path, full):
+        path.mkdir(parents=True, exist_ok=True)
+        (path / "dbt_project.yml").write_bytes((repo / "dbt_project.yml").read_bytes())
+
+    monkeypatch.setattr(dot_module, "get_commit_hashes", _no_git)
+    monkeypatch.setattr(dot_module, "create_worktree", _fake_create_worktree)
+    monkeypatch.setattr(dot_module, "write_isolated_profiles_yml", lambda *a, **k: None)
+
+    cmd = dot_module.dbt_command(
+        "build", dot_repo, None, gitref="HEAD", commit_hashes=("a" * 40, "a1b2c3d"),
+    )
+    assert (dot_repo / ".dot" / "build" / "a1b2c3d" / "commit").read_text() == "a" * 40
+    assert "--project-dir" in cmd
+
+def test_vars_json_stdlib_fallback_matches_json_dumps(monkeypatch):
+    monkeypatch.setattr(dot_module, "orjson", None)
+    payload = {"name": "é", "n": 1.5, "flags": [True, None], 1: "int key"}
+    assert _vars_json(payload) == json.dumps(payload)
+
+def test_vars_json_orjson_output_is_equivalent(monkeypatch):
+    pytest.importorskip("orjson")
+    payload = {"name": "é", "n": 1.5, "flags": [True, None], 1: "int key"}
+    with_orjson = _vars_json(payload)
+    monkeypatch.setattr(dot_module, "orjson", None)
+    assert json.loads(with_orjson) == json.loads(_vars_json(payload))
+
+def test_vars_json_rejects_unserializable(monkeypatch):
+    monkeypatch.setattr(dot_module, "orjson", None)
+    with pytest.raises(TypeError, match="not JSON serializable"):
+        _vars_json({"x": object()})
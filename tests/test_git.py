@@ -1,34 +1,55 @@
 import os
-import sys
+import subprocess
 import pytest
 from pathlib import Path
 
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
-
-from src.dot.git import get_short_commit_hash, get_full_commit_hash
+from dot import git as git_module
+from dot.git import get_short_commit_hash, get_full_commit_hash, get_commit_hashes
 
 @pytest.mark.parametrize("ref", ["HEAD", "main"])
-def test_get_full_commit_hash_various(ref: str):
-    try:
-        commit_hash = get_full_commit_hash(Path(os.getcwd()), ref)
-        assert isinstance(commit_hash, str)
-        assert len(commit_hash) == 40
-        int(commit_hash, 16)
-    except Exception:
-        if ref == "main":
-            pytest.skip("Branch 'main' does not exist in this repo")
-        else:
-            raise
+def test_get_full_commit_hash_various(ref: str, git_info: dict):
+    if git_info[ref] is None:
+        pytest.skip(f"Branch '{ref}' does not exist in this repo")
+    assert get_full_commit_hash(Path(os.getcwd()), ref) == git_info[ref]
 
 @pytest.mark.parametrize("ref", ["HEAD", "main"])
-def test_get_short_commit_hash_various(ref: str):
-    try:
-        short_hash = get_short_commit_hash(Path(os.getcwd()), ref)
-        assert isinstance(short_hash, str)
-        assert 7 <= len(short_hash) <= 40
-        int(short_hash, 16)
-    except Exception:
-        if ref == "main":
-            pytest.skip("Branch 'main' does not exist in this repo")
-        else:
-            raise
+def test_get_short_commit_hash_various(ref: str, git_info: dict):
+    if git_info[ref] is None:
+        pytest.skip(f"Branch '{ref}' does not exist in this repo")
+    short_hash = get_short_commit_hash(Path(os.getcwd()), ref)
+    assert 7 <= len(short_hash) <= 40
+    assert git_info[ref].startswith(short_hash)
+
+def test_get_commit_hashes_matches_individual_lookups(git_info: dict):
+    repo = Path(os.getcwd())
+    assert get_commit_hashes(repo, "HEAD") == (
+        get_full_commit_hash(repo, "HEAD"),
+        get_short_commit_hash(repo, "HEAD"),
+    )
+
+def test_get_commit_hashes_unknown_ref_raises(git_info: dict):
+    with pytest.raises(ValueError, match="Could not resolve git ref"):
+        get_commit_hashes(Path(os.getcwd()), "no-such-ref-for-dot-tests")
+
+
+def test_get_repo_path_follows_new_repositories(tmp_path: Path):
+    outer, inner = tmp_path / "outer", tmp_path / "outer" / "inner"
+    inner.mkdir(parents=True)
+    subprocess.run(["git", "init", "-q"], cwd=outer, check=True)
+    assert git_module.get_repo_path(inner).resolve() == outer.resolve()
+
+    subprocess.run(["git", "init", "-q"], cwd=inner, check=True)
+    assert git_module.get_repo_path(inner).resolve() == inner.resolve()
+
+
+def test_get_commit_hashes_follows_new_commits(dot_repo: Path):
+    first = get_commit_hashes(dot_repo, "HEAD")
+    subprocess.run(
+        ["git", "-c", "user.email=test@example.com", "-c", "user.name=Test User",
+         "commit", "-q", "--allow-empty", "-m", "second"],
+        cwd=dot_repo,
+        check=True,
+    )
+    second = get_commit_hashes(dot_repo, "HEAD")
+    assert second != first
+    assert second[0] == get_full_commit_hash(dot_repo, "HEAD")
@@ -1,48 +1,51 @@
-import sys
 import yaml
 import pytest
 from pathlib import Path
 
-# Ensure src/ is on the Python path for imports
-sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+# Use the LibYAML backend when available, as the package itself does
+try:
+    from yaml import CSafeLoader as Loader, CSafeDumper as Dumper
+except ImportError:
+    from yaml import SafeLoader as Loader, SafeDumper as Dumper
 
-from src.dot.profiles import write_isolated_profiles_yml
+from dot.profiles import (
+    write_isolated_profiles_yml,
+    _isolate_profiles,
+    _profiles_yml_path,
+    _dbt_project_profile_name,
+)
 
 # -----------------------------------------------------------------------------
 # Helpers
 # -----------------------------------------------------------------------------
 
-PROFILE_NAME = "test_profile"
+# Matches the profile in the shared dbt_project.yml template (see conftest)
+PROFILE_NAME = "test"
 ENVIRONMENT = "dev"
 
-def make_dbt_project(tmp_path: Path):
-    (tmp_path / "dbt_project.yml").write_text(f"name: example\nprofile: {PROFILE_NAME}\n", encoding="utf-8")
+def _profiles(target_block: dict) -> dict:
+    """
+    Parsed profiles.yml with a single profile + environment output.
+    """
+    return {PROFILE_NAME: {"target": ENVIRONMENT, "outputs": {ENVIRONMENT: target_block}}}
 
 def write_profiles_file(tmp_path: Path, target_block: dict) -> Path:
     """
-    Create a profiles.yml with a single profile + environment output.
+    Write `_profiles(target_block)` to tmp_path/profiles.yml.
     """
-    profiles_content = {
-        PROFILE_NAME: {
-            "target": ENVIRONMENT,
-            "outputs": {
-                ENVIRONMENT: target_block
-            }
-        }
-    }
     path = tmp_path / "profiles.yml"
-    path.write_text(yaml.safe_dump(profiles_content), encoding="utf-8")
+    path.write_bytes(yaml.dump(_profiles(target_block), Dumper=Dumper, encoding="utf-8"))
     return path
 
 # -----------------------------------------------------------------------------
 # Tests
 # -----------------------------------------------------------------------------
 
-def test_write_isolated_profiles_schema_only(tmp_path, monkeypatch):
+@pytest.mark.usefixtures("dbt_project")
+def test_write_isolated_profiles_schema_only(tmp_path):
     """
     When only 'schema' is present it should be suffixed with the short hash.
     """
-    make_dbt_project(tmp_path)
     original_schema = "analytics"
     profiles_path = write_profiles_file(
         tmp_path,
@@ -53,9 +56,6 @@ def test_write_isolated_profiles_schema_only(tmp_path, monkeypatch):
         }
     )
 
-    # Monkeypatch locator to return our temp profiles.yml
-    monkeypatch.setattr("src.dot.profiles._profiles_yml_path", lambda *args, **kwargs: profiles_path)
-
     isolated_env_path = tmp_path / ".dot" / "build" / "dummy" / "env" / ENVIRONMENT
     short_hash = "abc1234"
 
@@ -65,79 +65,115 @@ def test_write_isolated_profiles_schema_only(tmp_path, monkeypatch):
         isolated_environment_path=isolated_env_path,
         short_hash=short_hash,
         active_environment=ENVIRONMENT,
+        profiles_yml_path=profiles_path,
     )
 
     new_profiles_file = isolated_env_path / "profiles.yml"
     assert new_profiles_file.exists()
 
-    new_profiles = yaml.safe_load(new_profiles_file.read_text(encoding="utf-8"))
+    new_profiles = yaml.load(new_profiles_file.read_bytes(), Loader=Loader)
     target = new_profiles[PROFILE_NAME]["outputs"][ENVIRONMENT]
     assert target["schema"] == f"{original_schema}_{short_hash}"
     # Ensure unrelated keys preserved
     assert target["threads"] == 4
     assert "dataset" not in target
 
-def test_write_isolated_profiles_dataset_only(tmp_path, monkeypatch):
+def test_isolate_profiles_dataset_only():
     """
     When only 'dataset' is present it should behave like 'schema'.
     """
-    make_dbt_project(tmp_path)
     original_dataset = "raw_layer"
-    profiles_path = write_profiles_file(
-        tmp_path,
-        {
-            "type": "bigquery",
-            "dataset": original_dataset,
-            "method": "oauth"
-        }
-    )
-
-    monkeypatch.setattr("src.dot.profiles._profiles_yml_path", lambda *args, **kwargs: profiles_path)
-
-    isolated_env_path = tmp_path / ".dot" / "build" / "dummy" / "env" / ENVIRONMENT
+    source = _profiles({
+        "type": "bigquery",
+        "dataset": original_dataset,
+        "method": "oauth"
+    })
     short_hash = "fff9999"
 
-    write_isolated_profiles_yml(
-        dbt_project_path=tmp_path,
-        isolated_dbt_project_path=tmp_path / "isolated_project",
-        isolated_environment_path=isolated_env_path,
-        short_hash=short_hash,
-        active_environment=ENVIRONMENT,
-    )
+    new_profiles = _isolate_profiles(source, PROFILE_NAME, short_hash, ENVIRONMENT, Path("profiles.yml"))
 
-    new_profiles_file = isolated_env_path / "profiles.yml"
-    assert new_profiles_file.exists()
-
-    new_profiles = yaml.safe_load(new_profiles_file.read_text(encoding="utf-8"))
     target = new_profiles[PROFILE_NAME]["outputs"][ENVIRONMENT]
     assert target["dataset"] == f"{original_dataset}_{short_hash}"
     assert "schema" not in target
+    # Input left untouched
+    assert source[PROFILE_NAME]["outputs"][ENVIRONMENT]["dataset"] == original_dataset
 
-def test_write_isolated_profiles_both_schema_and_dataset_error(tmp_path, monkeypatch):
+def test_isolate_profiles_both_schema_and_dataset_error():
     """
     When both 'schema' and 'dataset' are present, raise ValueError.
     """
-    make_dbt_project(tmp_path)
-    profiles_path = write_profiles_file(
-        tmp_path,
-        {
-            "type": "postgres",
-            "schema": "foo",
-            "dataset": "bar"
-        }
-    )
-
-    monkeypatch.setattr("src.dot.profiles._profiles_yml_path", lambda *args, **kwargs: profiles_path)
-
-    isolated_env_path = tmp_path / ".dot" / "build" / "dummy" / "env" / ENVIRONMENT
+    source = _profiles({
+        "type": "postgres",
+        "schema": "foo",
+        "dataset": "bar"
+    })
 
     with pytest.raises(ValueError) as exc:
-        write_isolated_profiles_yml(
-            dbt_project_path=tmp_path,
-            isolated_dbt_project_path=tmp_path / "isolated_project",
-            isolated_environment_path=isolated_env_path,
-            short_hash="deadbee",
-            active_environment=ENVIRONMENT,
-        )
+        _isolate_profiles(source, PROFILE_NAME, "deadbee", ENVIRONMENT, Path("profiles.yml"))
 
     assert "Both 'schema' and 'dataset' are set" in str(exc.value)
+
+
+@pytest.mark.parametrize("present, expected", [
+    (["env_arg", "env_var", "cwd", "home"], "env_arg"),
+    (["env_var", "cwd", "home"], "env_var"),
+    (["cwd", "home"], "cwd"),
+    (["home"], "home"),
+])
+@pytest.mark.usefixtures("dbt_project")
+def test_profiles_yml_path_follows_dbt_precedence(tmp_path, monkeypatch, present, expected):
+    """
+    profiles.yml is located without running dbt, using dbt's precedence order.
+    """
+    project = tmp_path
+    dirs = {
+        "env_arg": tmp_path / "env_arg",
+        "env_var": tmp_path / "env_var",
+        "cwd": tmp_path / "cwd",
+        "home": tmp_path / "home" / ".dbt",
+    }
+    for name in present:
+        dirs[name].mkdir(parents=True)
+        (dirs[name] / "profiles.yml").write_text("{}\n", encoding="utf-8")
+
+    env_block = f"    profiles-dir: {dirs['env_arg']}\n" if "env_arg" in present else ""
+    (project / "dot_environments.yml").write_text(
+        f"environment:\n  default: {ENVIRONMENT}\n  {ENVIRONMENT}:\n    target: {ENVIRONMENT}\n{env_block}",
+        encoding="utf-8",
+    )
+    if "env_var" in present:
+        monkeypatch.setenv("DBT_PROFILES_DIR", str(dirs["env_var"]))
+    else:
+        monkeypatch.delenv("DBT_PROFILES_DIR", raising=False)
+    dirs["cwd"].mkdir(exist_ok=True)
+    monkeypatch.chdir(dirs["cwd"])
+    monkeypatch.setattr(Path, "home", lambda: tmp_path / "home")
+
+    assert _profiles_yml_path(project, ENVIRONMENT) == dirs[expected] / "profiles.yml"
+
+@pytest.mark.usefixtures("dbt_project")
+def test_profiles_yml_path_missing_raises(tmp_path, monkeypatch):
+    missing_dir = tmp_path / "nowhere"
+    monkeypatch.setenv("DBT_PROFILES_DIR", str(missing_dir))
+
+    with pytest.raises(FileNotFoundError) as exc:
+        _profiles_yml_path(tmp_path, None)
+
+    assert str(missing_dir / "profiles.yml") in str(exc.value)
+
+
+def test_dbt_project_profile_name_cached_until_file_changes(tmp_path):
+    project_yml = tmp_path / "dbt_project.yml"
+    project_yml.write_text("name: example\nprofile: first\n", encoding="utf-8")
+    st = project_yml.stat()
+    key = (str(project_yml), st.st_mtime_ns, st.st_size)
+    assert _dbt_project_profile_name(*key) == "first"
+
+    hits = _dbt_project_profile_name.cache_info().hits
+    assert _dbt_project_profile_name(*key) == "first"
+    assert _dbt_project_profile_name.cache_info().hits == hits + 1
+
+    # A different size (and usually mtime) produces a new key
+    project_yml.write_text("name: example\nprofile: second_profile\n", encoding="utf-8")
+    st = project_yml.stat()
+    assert _dbt_project_profile_name(str(project_yml), st.st_mtime_ns, st.st_size) == "second_profile"